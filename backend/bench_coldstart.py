@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the API module.
+
+Each run starts a fresh interpreter (like a Vercel cold start) and measures:
+  - import time of server_with_changes (python -X importtime)
+  - time to first response: interpreter start -> import -> GET /api/health
+  - the first data request (GET /api/news), which pays for building the
+    Firestore client, and the latency of a /api/health request sent while it
+    is in flight - that one stays small only if client construction keeps off
+    the event loop
+
+Medians over several runs are checked against coldstart_budget.json and the
+script exits non-zero if any budget is exceeded.
+
+    python bench_coldstart.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGET = os.path.join(BACKEND_DIR, "coldstart_budget.json")
+MODULE = "server_with_changes"
+
+FIRST_RESPONSE_SNIPPET = f"""
+import asyncio, time
+start = time.perf_counter()
+import httpx
+from {MODULE} import app
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://coldstart") as client:
+        response = await client.get("/api/health")
+        assert response.status_code == 200, response.status_code
+
+asyncio.run(first_request())
+print((time.perf_counter() - start) * 1000)
+"""
+
+FIRST_DATA_SNIPPET = f"""
+import asyncio, time
+import httpx
+from {MODULE} import app
+
+async def timed(client, path, delay=0.0):
+    await asyncio.sleep(delay)
+    start = time.perf_counter()
+    response = await client.get(path)
+    assert response.status_code == 200, (path, response.status_code)
+    return (time.perf_counter() - start) * 1000
+
+async def first_data_request():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://coldstart") as client:
+        await client.get("/api/health")  # app warm, Firestore client not built yet
+        return await asyncio.gather(timed(client, "/api/news"), timed(client, "/api/health", 0.05))
+
+data_ms, health_ms = asyncio.run(first_data_request())
+print(data_ms, health_ms)
+"""
+
+
+def run_python(args):
+    return subprocess.run(
+        [sys.executable] + args,
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def measure_import():
+    """Return (total import ms, [(cumulative ms, module), ...]) for one cold import
+
+    The module list holds the direct imports of the API module, heaviest first.
+    """
+    result = run_python(["-X", "importtime", "-c", f"import {MODULE}"])
+    modules = []
+    total_ms = None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        try:
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # header line
+        name = parts[2].strip()
+        depth = (len(parts[2]) - len(parts[2].lstrip()) - 1) // 2
+        if depth == 1:
+            modules.append((cumulative_us / 1000.0, name))
+        if name == MODULE:
+            total_ms = cumulative_us / 1000.0
+    return total_ms, sorted(modules, reverse=True)
+
+
+def measure_first_response():
+    """Return (in-process ms, wall-clock ms including interpreter startup)"""
+    start = time.perf_counter()
+    result = run_python(["-c", FIRST_RESPONSE_SNIPPET])
+    wall_ms = (time.perf_counter() - start) * 1000
+    return float(result.stdout.strip().splitlines()[-1]), wall_ms
+
+
+def measure_first_data_request():
+    """Return (first GET /api/news ms, concurrent GET /api/health ms)"""
+    data_ms, health_ms = run_python(["-c", FIRST_DATA_SNIPPET]).stdout.strip().splitlines()[-1].split()
+    return float(data_ms), float(health_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", default=DEFAULT_BUDGET)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    import_runs, first_runs, wall_runs, data_runs, health_runs = [], [], [], [], []
+    heaviest = []
+    for _ in range(args.runs):
+        total_ms, modules = measure_import()
+        import_runs.append(total_ms)
+        heaviest = modules[:10]
+        first_ms, wall_ms = measure_first_response()
+        first_runs.append(first_ms)
+        wall_runs.append(wall_ms)
+        data_ms, health_ms = measure_first_data_request()
+        data_runs.append(data_ms)
+        health_runs.append(health_ms)
+
+    results = {
+        "import_ms": statistics.median(import_runs),
+        "first_response_ms": statistics.median(first_runs),
+        "process_first_response_ms": statistics.median(wall_runs),
+        "first_data_response_ms": statistics.median(data_runs),
+        "health_during_first_data_ms": statistics.median(health_runs),
+    }
+
+    with open(args.budget) as f:
+        budget = json.load(f)
+
+    over_budget = {k: v for k, v in results.items() if k in budget and v > budget[k]}
+
+    if args.json:
+        print(json.dumps({"results": results, "budget": budget, "over_budget": sorted(over_budget)}, indent=2))
+    else:
+        print(f"Cold start ({args.runs} runs, medians)")
+        for key, value in results.items():
+            limit = budget.get(key)
+            marker = "" if limit is None else ("  OVER BUDGET" if key in over_budget else "  ok")
+            limit_text = "-" if limit is None else f"{limit:.0f}"
+            print(f"  {key:28s} {value:8.1f} ms  (budget {limit_text}){marker}")
+        print("\nHeaviest direct imports (last run)")
+        for ms, name in heaviest:
+            print(f"  {ms:8.1f} ms  {name}")
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
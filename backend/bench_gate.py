@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Performance regression gate for the scaling benchmark suite.
+
+Runs bench_scaling.py's cases several times, reduces each metric to the
+median across runs plus its MAD (median absolute deviation), and compares
+against bench_baseline.json. A metric regresses only when it is slower than
+the baseline by more than its tolerance (relative + absolute slack) AND by
+more than mad_multiplier x the combined noise of both measurements, so a
+single noisy run cannot fail the gate. Metrics that still look slower are
+measured again (--confirm-runs) and only fail if the regression persists.
+
+The gate also fails when a baselined case is missing from the run (e.g. an
+admin case skipped because login broke) or its status codes changed (a route
+that starts failing fast would otherwise read as "improved"). Exits 1 on any
+failure.
+
+    python bench_gate.py                      # compare against the baseline
+    python bench_gate.py --update-baseline    # re-record it (keeps tolerances)
+
+Baselines are machine specific: record and check them on the same runner.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import statistics
+import sys
+
+from bench_scaling import run_benchmarks
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "bench_baseline.json")
+METRICS = ["median_ms", "cold_ms"]
+# The absolute slack keeps sub-millisecond jitter on fast cases from ever failing the gate
+DEFAULT_TOLERANCES = {
+    "median_ms": {"relative": 0.5, "absolute_ms": 2.0, "mad_multiplier": 3.0},
+    "cold_ms": {"relative": 1.0, "absolute_ms": 10.0, "mad_multiplier": 3.0},
+}
+DEFAULT_REPEAT = 30
+FAILING_STATUSES = {"REGRESSION", "MISSING", "STATUS CHANGED"}
+MAD_TO_SIGMA = 1.4826  # scales MAD to a standard deviation for normally distributed noise
+
+
+def case_key(result):
+    return f"{result['engine']}/{result['scale']}/{result['name']}"
+
+
+def metric_key(result, metric):
+    return f"{case_key(result)}/{metric}"
+
+
+def collect_statuses(reports):
+    """case key -> sorted outcomes seen in any run: HTTP status codes, or "ok"/"error" for helpers"""
+    outcomes = {}
+    for report in reports:
+        for result in report["results"]:
+            if result["kind"] == "endpoint":
+                seen = {str(code) for code in result["statuses"]}
+            else:
+                seen = {"error" if result.get("errors") else "ok"}
+            outcomes.setdefault(case_key(result), set()).update(seen)
+    return {key: sorted(values) for key, values in outcomes.items()}
+
+
+def collect_metrics(reports):
+    """metric key -> {"median", "mad", "runs"} across several benchmark reports"""
+    samples = {}
+    for report in reports:
+        for result in report["results"]:
+            for metric in METRICS:
+                if result.get(metric) is not None:
+                    samples.setdefault(metric_key(result, metric), []).append(result[metric])
+    metrics = {}
+    for key, values in samples.items():
+        median = statistics.median(values)
+        metrics[key] = {
+            "median": round(median, 4),
+            "mad": round(statistics.median(abs(v - median) for v in values), 4),
+            "runs": len(values),
+        }
+    return metrics
+
+
+def get_tolerance(baseline, key):
+    """Tolerance for one metric: per-metric override, else per-kind default"""
+    metric = key.rsplit("/", 1)[1]
+    tolerance = dict(DEFAULT_TOLERANCES[metric])
+    tolerance.update(baseline.get("tolerances", {}).get(metric, {}))
+    tolerance.update(baseline.get("overrides", {}).get(key, {}))
+    return tolerance
+
+
+def compare(baseline, current, current_statuses):
+    rows = []
+    for key, expected in sorted(baseline.get("statuses", {}).items()):
+        seen = current_statuses.get(key)
+        if seen is not None and seen != expected:
+            rows.append({"metric": key, "status": "STATUS CHANGED", "expected": expected, "seen": seen})
+    for key, base in sorted(baseline["metrics"].items()):
+        now = current.get(key)
+        if now is None:
+            rows.append({"metric": key, "status": "MISSING", "baseline": base["median"]})
+            continue
+        tolerance = get_tolerance(baseline, key)
+        delta = now["median"] - base["median"]
+        noise = MAD_TO_SIGMA * math.hypot(base["mad"], now["mad"]) * tolerance["mad_multiplier"]
+        allowed = max(base["median"] * tolerance["relative"] + tolerance["absolute_ms"], noise)
+        if delta > allowed:
+            status = "REGRESSION"
+        elif -delta > allowed:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({
+            "metric": key,
+            "status": status,
+            "baseline": base["median"],
+            "current": now["median"],
+            "change_pct": (delta / base["median"] * 100) if base["median"] else 0.0,
+            "allowed_ms": allowed,
+            "mad": now["mad"],
+        })
+    for key in sorted(set(current) - set(baseline["metrics"])):
+        rows.append({"metric": key, "status": "new", "current": current[key]["median"]})
+    return rows
+
+
+def print_report(rows, verbose):
+    shown = [r for r in rows if verbose or r["status"] != "ok"]
+    width = max([len(r["metric"]) for r in shown] + [6])
+    print(f"\n{'metric':{width}}  {'baseline':>10} {'current':>10} {'change':>8} {'allowed':>9}  status")
+    for r in shown:
+        if r["status"] == "STATUS CHANGED":
+            print(f"{r['metric']:{width}}  statuses {','.join(r['expected'])} -> {','.join(r['seen'])}  {r['status']}")
+            continue
+        if r["status"] in ("MISSING", "new"):
+            value = r.get("baseline", r.get("current"))
+            print(f"{r['metric']:{width}}  {value:10.2f} {'':>10} {'':>8} {'':>9}  {r['status']}")
+            continue
+        print(f"{r['metric']:{width}}  {r['baseline']:10.2f} {r['current']:10.2f} {r['change_pct']:+7.1f}% "
+              f"{r['allowed_ms']:8.2f}ms  {r['status']}")
+    counts = {}
+    for r in rows:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    print("\n" + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--runs", type=int, default=5, help="Benchmark suite repetitions")
+    parser.add_argument("--confirm-runs", type=int, help="Extra repetitions when a regression shows up (default: --runs)")
+    parser.add_argument("--repeat", type=int, help="Warm iterations per case (default: baseline's)")
+    parser.add_argument("--scales", help="Comma-separated scales (default: baseline's)")
+    parser.add_argument("--engines", default="memory")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="Show unchanged metrics too")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    elif not args.update_baseline:
+        sys.exit(f"No baseline at {args.baseline}; record one with --update-baseline")
+    settings = baseline.get("settings", {})
+    scales = (args.scales or ",".join(settings.get("scales", ["1k"]))).split(",")
+    repeat = args.repeat or settings.get("repeat", DEFAULT_REPEAT)
+
+    def run_suite(runs):
+        return [asyncio.run(run_benchmarks(scales, args.engines.split(","), repeat)) for _ in range(runs)]
+
+    reports = run_suite(args.runs)
+    current = collect_metrics(reports)
+    current_statuses = collect_statuses(reports)
+
+    if args.update_baseline:
+        baseline.update(
+            meta=reports[-1]["meta"],
+            settings={"scales": scales, "repeat": repeat, "runs": args.runs},
+            tolerances=baseline.get("tolerances", DEFAULT_TOLERANCES),
+            overrides=baseline.get("overrides", {}),
+            metrics=current,
+            statuses=current_statuses,
+        )
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nRecorded {len(current)} metrics to {args.baseline}")
+        return
+
+    rows = compare(baseline, current, current_statuses)
+    if any(r["status"] == "REGRESSION" for r in rows):
+        # Confirm against more runs: a slow stretch on a shared machine moves every run at once
+        print(f"\n{sum(r['status'] == 'REGRESSION' for r in rows)} possible regressions, confirming...")
+        reports += run_suite(args.confirm_runs or args.runs)
+        current = collect_metrics(reports)
+        rows = compare(baseline, current, collect_statuses(reports))
+    print_report(rows, args.verbose)
+    if any(r["status"] in FAILING_STATUSES for r in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
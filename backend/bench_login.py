@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Login throughput vs. public read latency under password-guessing load.
+
+Runs the API in-process (httpx ASGI transport, same event loop as a real
+uvicorn worker) and measures:
+  1. baseline latency of a public read endpoint
+  2. the same latency while attackers hammer /api/auth/login
+
+Two attack shapes are run: a single IP (throttled by the per-IP token bucket)
+and many spoofed IPs (every attempt reaches bcrypt in the password pool).
+
+    python bench_login.py --duration 5 --attackers 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+import server_with_changes as server
+from bench_stats import percentile
+from server_with_changes import app
+
+PUBLIC_ENDPOINT = "/api/research-areas"
+
+
+async def public_reader(client, stop_at, latencies):
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        await client.get(PUBLIC_ENDPOINT)
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+
+
+async def attacker(client, stop_at, ip, results):
+    while time.perf_counter() < stop_at:
+        response = await client.post(
+            "/api/auth/login",
+            json={"username": "admin", "password": "wrong-password"},
+            headers={"X-Forwarded-For": ip}
+        )
+        results[response.status_code] = results.get(response.status_code, 0) + 1
+        if response.status_code == 429:
+            await asyncio.sleep(0.01)
+
+
+async def run_phase(name, duration, attacker_ips):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up lazy state (default user hash, route caches)
+        await client.get(PUBLIC_ENDPOINT)
+        await client.post("/api/auth/login", json={"username": "admin", "password": "warmup"},
+                          headers={"X-Forwarded-For": "10.255.255.255"})
+
+        latencies = []
+        results = {}
+        stop_at = time.perf_counter() + duration
+        tasks = [asyncio.create_task(public_reader(client, stop_at, latencies))]
+        tasks += [asyncio.create_task(attacker(client, stop_at, ip, results)) for ip in attacker_ips]
+        await asyncio.gather(*tasks)
+
+    attempts = sum(results.values())
+    print(f"\n{name}")
+    print("-" * len(name))
+    print(f"  login attempts/s : {attempts / duration:8.1f}  {dict(sorted(results.items()))}")
+    print(f"  throttled (429)  : {results.get(429, 0)}   shed by password pool (503): {results.get(503, 0)}")
+    print(f"  public reads     : {len(latencies)}")
+    print(f"  public p50/p95/p99 (ms): {percentile(latencies, 50):.2f} / "
+          f"{percentile(latencies, 95):.2f} / {percentile(latencies, 99):.2f}"
+          f"  max {max(latencies, default=0):.2f}")
+    return {
+        "login_per_sec": attempts / duration,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p99": percentile(latencies, 99),
+        "throttled": results.get(429, 0),
+        "shed": results.get(503, 0),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--attackers", type=int, default=20)
+    args = parser.parse_args()
+
+    # Every request arrives from the ASGI transport's single client address; act as if one
+    # trusted proxy sits in front so the spoofed X-Forwarded-For picks each attacker's bucket
+    server.TRUST_PROXY_HEADERS = True
+    server.TRUSTED_PROXY_HOPS = 1
+
+    await run_phase("Baseline (no attack)", args.duration, [])
+    await run_phase("Attack from a single IP", args.duration, ["10.0.0.1"] * args.attackers)
+    await run_phase("Attack from many IPs", args.duration,
+                    [f"10.1.{i // 250}.{i % 250}" for i in range(args.attackers)])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
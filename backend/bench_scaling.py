@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark: every public endpoint and CRUD helper at several dataset sizes.
+
+For each scale and storage engine the synthetic dataset (generate_dataset.py)
+is loaded, derived indexes are reset, and each case is timed once cold (first
+call, which pays for lazy index builds) and then --repeat times warm. Endpoints
+run through the in-process app (httpx ASGI transport); helpers are called
+directly.
+
+Engines:
+  memory     the in-process store used when Firestore is unavailable
+  firestore  only when FIRESTORE_EMULATOR_HOST points at a running local emulator
+
+--latency-ms, --jitter-ms and --error-rate add simulated round trip time and
+transient failures to every data-layer call (see SIMULATED_* in the server),
+which makes the p95 column meaningful for the tail latency production sees.
+
+    python bench_scaling.py --scales 1k,10k --repeat 20 --out bench_results.json
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python bench_scaling.py --engines firestore \
+        --latency-ms 15 --jitter-ms 10 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+import httpx
+
+import server_with_changes as server
+from bench_stats import percentile
+from generate_dataset import emulator_reachable, generate_dataset, parse_scale, seed_firestore, with_storage_fields
+
+SEARCH_TERMS = ["grid", "solar", "storage", "micro", "forecasting", "rahman"]
+
+# (name, path template, query params) - {collection} placeholders are filled with random IDs
+ENDPOINTS = [
+    ("GET /api/research-areas", "/api/research-areas", {}),
+    ("GET /api/research-areas/{id}", "/api/research-areas/{research_areas}", {}),
+    ("GET /api/research-areas/{id}/expanded", "/api/research-areas/{research_areas}/expanded", {}),
+    ("GET /api/people", "/api/people", {}),
+    ("GET /api/people?category", "/api/people", {"category": "advisor"}),
+    ("GET /api/people/{id}/publications", "/api/people/{people}/publications", {}),
+    ("GET /api/people/{id}/projects", "/api/people/{people}/projects", {}),
+    ("GET /api/publications", "/api/publications", {}),
+    ("GET /api/publications?year", "/api/publications", {"year": 2022}),
+    ("GET /api/publications?research_area", "/api/publications", {"research_area": "Smart Grid Technologies"}),
+    ("GET /api/publications?search", "/api/publications", {"search": "{term}"}),
+    ("GET /api/publications?search&fuzzy", "/api/publications", {"search": "{term}", "fuzzy": "true"}),
+    ("GET /api/projects", "/api/projects", {}),
+    ("GET /api/achievements", "/api/achievements", {}),
+    ("GET /api/news", "/api/news", {}),
+    ("GET /api/news?limit", "/api/news", {"limit": 10}),
+    ("GET /api/news/{id}", "/api/news/{news}", {}),
+    ("GET /api/events", "/api/events", {}),
+    ("GET /api/photo-gallery", "/api/photo-gallery", {}),
+    ("GET /api/settings", "/api/settings", {}),
+    ("GET /api/search", "/api/search", {"q": "{term}"}),
+    ("GET /api/search/fuzzy", "/api/search/fuzzy", {"q": "{term}"}),
+    ("GET /api/autocomplete", "/api/autocomplete", {"q": "{prefix}"}),
+    ("GET /api/dashboard/stats", "/api/dashboard/stats", {}),
+]
+ADMIN_ENDPOINTS = {"GET /api/dashboard/stats"}
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "iterations": len(ordered),
+        "median_ms": statistics.median(ordered),
+        "p95_ms": percentile(ordered, 95),
+        "mean_ms": statistics.fmean(ordered),
+        "min_ms": ordered[0],
+    }
+
+
+def reset_derived_state():
+    """Forget every lazily built index so the next request rebuilds it from the new data"""
+    server.search_index = None
+    server.search_docs.clear()
+    server.trigram_index = None
+    server.trigram_doc_terms.clear()
+    server.autocomplete_index = None
+    server.autocomplete_doc_terms.clear()
+    server.author_link_index = None
+    server.research_area_index = None
+
+
+def load_engine(engine, dataset):
+    if engine == "memory":
+        server.db = None
+        server.firebase_init_attempted = True
+        for collection_name, docs in dataset.items():
+            server.in_memory_db[collection_name] = [dict(doc) for doc in docs]
+    else:
+        server.firebase_init_attempted = False
+        if server.get_db() is None:
+            raise RuntimeError("Firestore client could not be created")
+        # Seeding is not a measured data call, so it runs without simulated latency or errors
+        simulated = server.SIMULATED_LATENCY_MS, server.SIMULATED_JITTER_MS, server.SIMULATED_ERROR_RATE
+        server.SIMULATED_LATENCY_MS = server.SIMULATED_JITTER_MS = server.SIMULATED_ERROR_RATE = 0
+        try:
+            seed_firestore(server.get_db(), dataset)
+        finally:
+            server.SIMULATED_LATENCY_MS, server.SIMULATED_JITTER_MS, server.SIMULATED_ERROR_RATE = simulated
+    reset_derived_state()
+
+
+def fill(template, ids, rng):
+    term = rng.choice(SEARCH_TERMS)
+    values = {"term": term, "prefix": term[:2]}
+    values.update({collection: rng.choice(doc_ids) if doc_ids else "missing" for collection, doc_ids in ids.items()})
+    return template.format(**values) if isinstance(template, str) else template
+
+
+async def time_endpoint(client, name, path, params, headers, ids, repeat, rng):
+    samples = []
+    statuses = set()
+    cold_ms = None
+    for i in range(repeat + 1):
+        url = fill(path, ids, rng)
+        query = {key: fill(value, ids, rng) for key, value in params.items()}
+        start = time.perf_counter()
+        response = await client.get(url, params=query, headers=headers)
+        elapsed = (time.perf_counter() - start) * 1000
+        statuses.add(response.status_code)
+        if i == 0:
+            cold_ms = elapsed
+        else:
+            samples.append(elapsed)
+    return {"kind": "endpoint", "name": name, "cold_ms": cold_ms, "statuses": sorted(statuses), **summarize(samples)}
+
+
+def time_helper(name, func, repeat):
+    samples = []
+    cold_ms = None
+    errors = 0
+    for i in range(repeat + 1):
+        start = time.perf_counter()
+        try:
+            func(i)
+        except Exception:
+            errors += 1  # only expected with a simulated error rate
+        elapsed = (time.perf_counter() - start) * 1000
+        if i == 0:
+            cold_ms = elapsed
+        else:
+            samples.append(elapsed)
+    return {"kind": "helper", "name": name, "cold_ms": cold_ms, "errors": errors, **summarize(samples)}
+
+
+def helper_cases(ids, rng):
+    created = []
+
+    def add(_):
+        created.append(server.add_document("news", {
+            "title": "Benchmark item", "content": "<p>Benchmark</p>", "excerpt": "Benchmark",
+            "author": "bench", "published_date": "2024-01-01T00:00:00", "category": "news",
+            "is_featured": False, "tags": ["benchmark"], "status": "draft",
+        })["id"])
+
+    def update(i):
+        server.update_document("news", created[i % len(created)], {"title": f"Benchmark item {i}"})
+
+    def delete(i):
+        if created:
+            server.delete_document("news", created.pop())
+
+    some_ids = lambda collection, n: rng.sample(ids[collection], min(n, len(ids[collection])))
+    return [
+        ("get_collection_data(publications)", lambda i: server.get_collection_data("publications")),
+        ("get_collection_data(news, filtered)", lambda i: server.get_collection_data(
+            "news", filters=[("status", "==", "published")], limit=20)),
+        ("get_collection_data(people)", lambda i: server.get_collection_data("people")),
+        ("get_document(publications)", lambda i: server.get_document("publications", rng.choice(ids["publications"]))),
+        ("get_documents(publications, 50)", lambda i: server.get_documents("publications", some_ids("publications", 50))),
+        ("add_document(news)", add),
+        ("update_document(news)", update),
+        ("delete_document(news)", delete),
+    ]
+
+
+async def run_case_set(scale, engine, repeat, seed):
+    dataset = with_storage_fields(generate_dataset(scale, seed), seed)
+    load_engine(engine, dataset)
+    ids = {collection_name: [doc["id"] for doc in docs] for collection_name, docs in dataset.items()}
+    ids["research_areas"] = [area["id"] for area in server.get_collection_data("research_areas")]
+    rng = random.Random(seed)
+
+    results = []
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120.0) as client:
+        server.login_buckets.clear()  # repeated runs must not trip the login rate limit
+        login = await client.post("/api/auth/login", json={
+            "username": os.getenv("ADMIN_USERNAME", "admin"),
+            "password": os.getenv("ADMIN_PASSWORD", "@dminsesg705"),
+        })
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"} if login.status_code == 200 else {}
+        for name, path, params in ENDPOINTS:
+            if name in ADMIN_ENDPOINTS and not headers:
+                continue
+            result = await time_endpoint(client, name, path, params, headers, ids, repeat, rng)
+            results.append(result)
+            print(f"  {name:45} cold {result['cold_ms']:9.2f}  median {result['median_ms']:9.2f}  "
+                  f"p95 {result['p95_ms']:9.2f} ms")
+
+    for name, func in helper_cases(ids, rng):
+        result = time_helper(name, func, repeat)
+        results.append(result)
+        print(f"  {name:45} cold {result['cold_ms']:9.2f}  median {result['median_ms']:9.2f}  "
+              f"p95 {result['p95_ms']:9.2f} ms")
+
+    for result in results:
+        result.update(scale=scale, documents=parse_scale(scale), engine=engine)
+    return results
+
+
+def get_engines(requested):
+    engines = []
+    for engine in requested:
+        if engine == "firestore" and not emulator_reachable():
+            print("Skipping firestore engine: no emulator reachable at FIRESTORE_EMULATOR_HOST")
+            continue
+        engines.append(engine)
+    return engines
+
+
+def get_git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+async def run_benchmarks(scales, engines, repeat, seed=42):
+    results = []
+    for scale in scales:
+        for engine in get_engines(engines):
+            print(f"\n{engine} @ {scale}")
+            results += await run_case_set(scale, engine, repeat, seed)
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "commit": get_git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed,
+            "simulated": {
+                "latency_ms": server.SIMULATED_LATENCY_MS,
+                "jitter_ms": server.SIMULATED_JITTER_MS,
+                "error_rate": server.SIMULATED_ERROR_RATE,
+            },
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1k,10k", help="Comma-separated dataset sizes (1k, 10k, 100k)")
+    parser.add_argument("--engines", default="memory,firestore", help="Comma-separated storage engines")
+    parser.add_argument("--repeat", type=int, default=20, help="Warm iterations per case")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--latency-ms", type=float, default=server.SIMULATED_LATENCY_MS,
+                        help="Simulated latency added to every data call")
+    parser.add_argument("--jitter-ms", type=float, default=server.SIMULATED_JITTER_MS,
+                        help="Mean of the exponential jitter added on top")
+    parser.add_argument("--error-rate", type=float, default=server.SIMULATED_ERROR_RATE,
+                        help="Probability that a data call fails")
+    args = parser.parse_args()
+    server.SIMULATED_LATENCY_MS = args.latency_ms
+    server.SIMULATED_JITTER_MS = args.jitter_ms
+    server.SIMULATED_ERROR_RATE = args.error_rate
+
+    report = asyncio.run(run_benchmarks(args.scales.split(","), args.engines.split(","), args.repeat, args.seed))
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(report['results'])} results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
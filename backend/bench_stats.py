@@ -0,0 +1,10 @@
+"""Statistics helpers shared by the benchmark and load-test scripts."""
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (pct in 0..100); 0.0 for no values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
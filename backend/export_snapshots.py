@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Export every public GET endpoint to static JSON snapshots.
+
+Run after the frontend build so the files land in the deployed output:
+
+    cd frontend && yarn build
+    cd ../backend && python export_snapshots.py
+
+Files are written to frontend/build/snapshots/<version>/ (override with --out or
+SNAPSHOT_DIR) and frontend/build/snapshots/latest.json maps API paths to files.
+Start the API with SNAPSHOT_MODE=true to serve these files directly.
+"""
+
+import argparse
+import asyncio
+
+from server_with_changes import SNAPSHOT_DIR, export_snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=SNAPSHOT_DIR, help="snapshot root directory")
+    parser.add_argument("--version", default=None, help="version label (default: UTC timestamp)")
+    args = parser.parse_args()
+
+    manifest = asyncio.run(export_snapshots(args.out, args.version))
+    print(f"Exported {len(manifest['files'])} snapshots (version {manifest['version']}) to {args.out}")
+    for key, entry in sorted(manifest["files"].items()):
+        print(f"  {key:55s} -> {entry['file']}")
+
+
+if __name__ == "__main__":
+    main()
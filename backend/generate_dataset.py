@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for benchmarks and local testing.
+
+Produces people, publications (multi-author, keywords, research areas),
+projects, news with rich-text bodies, events, achievements and gallery items.
+Every document is validated against the API's Pydantic models, so the data
+looks exactly like what the admin forms would have written.
+
+    python generate_dataset.py --scale 10k --out dataset-10k.json
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python generate_dataset.py --scale 10k --firestore
+
+Scales are total document counts ("1k", "10k", "100k" or a plain number).
+The same seed always produces the same dataset.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import urllib.request
+import uuid
+from datetime import datetime, timedelta
+
+# Share of the total document count per collection
+COLLECTION_SHARES = {
+    "publications": 0.40,
+    "news": 0.20,
+    "projects": 0.08,
+    "events": 0.10,
+    "achievements": 0.05,
+    "photo_gallery": 0.12,
+    "people": 0.05,
+}
+SCALES = {"1k": 1000, "10k": 10000, "100k": 100000}
+
+FIRST_NAMES = ["Mohammad", "Muhammad", "Sarah", "Fatima", "Karim", "Tanvir", "Nusrat", "Rahim", "Ayesha",
+               "Mizanur", "Farhana", "Shafiq", "Tahmina", "Imran", "Nadia", "Arif", "Sadia", "Habib", "Rumana",
+               "Zahid", "Jannat", "Kamal", "Shirin", "Omar", "Laila", "Hasan", "Sumaiya", "Rafiq", "Anika"]
+LAST_NAMES = ["Rahman", "Ahmed", "Hassan", "Ali", "Islam", "Hossain", "Chowdhury", "Karim", "Uddin", "Khan",
+              "Akter", "Begum", "Sarker", "Das", "Roy", "Siddique", "Haque", "Miah", "Talukder", "Bhuiyan"]
+HONORIFICS = ["Dr.", "Prof.", "Eng.", "Mr.", "Ms.", ""]
+RESEARCH_AREAS = [
+    "Smart Grid Technologies", "Microgrids & Distributed Energy Systems", "Renewable Energy Integration",
+    "Grid Optimization & Stability", "Energy Storage Systems", "Power System Automation",
+    "Cybersecurity and AI for Power Infrastructure",
+]
+KEYWORDS = ["smart grid", "microgrid", "solar PV", "wind energy", "battery storage", "demand response",
+            "load forecasting", "machine learning", "power electronics", "frequency control", "SCADA",
+            "electric vehicles", "optimal power flow", "state estimation", "cybersecurity", "IoT",
+            "blockchain", "deep learning", "hydrogen", "energy management", "fault detection", "inverters"]
+TOPIC_WORDS = ["Adaptive", "Robust", "Distributed", "Data-Driven", "Hierarchical", "Stochastic", "Real-Time",
+               "Decentralized", "Predictive", "Resilient", "Secure", "Scalable"]
+TOPIC_NOUNS = ["Control", "Optimization", "Forecasting", "Scheduling", "Protection", "Estimation", "Planning",
+               "Coordination", "Monitoring", "Integration"]
+VENUES = ["IEEE Transactions on Smart Grid", "Applied Energy", "Energy Reports", "IEEE Access",
+          "Renewable Energy", "Electric Power Systems Research", "IEEE PES General Meeting",
+          "International Conference on Power and Energy Systems"]
+CATEGORIES = {
+    "people": ["advisor", "team_member", "collaborator"],
+    "publication_type": ["journal", "conference", "book_chapter"],
+    "project_status": ["planning", "ongoing", "completed"],
+    "news": ["news", "events", "upcoming_events"],
+    "event_type": ["seminar", "workshop", "conference", "webinar"],
+    "achievement": ["award", "grant", "recognition", "publication"],
+    "gallery": ["research", "events", "lab", "field work"],
+}
+LOREM = ("grid energy renewable storage control system power network model data analysis results method "
+         "approach performance optimal voltage frequency demand supply distributed operation research "
+         "study simulation proposed efficient reliable integration").split()
+
+
+def sentence(rng, words=12):
+    text = " ".join(rng.choice(LOREM) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def paragraph(rng, sentences=4):
+    return " ".join(sentence(rng, rng.randint(8, 18)) for _ in range(sentences))
+
+
+def rich_text(rng, paragraphs):
+    parts = []
+    for i in range(paragraphs):
+        if i and rng.random() < 0.3:
+            parts.append(f"<h2>{sentence(rng, 4)[:-1]}</h2>")
+        if rng.random() < 0.2:
+            items = "".join(f"<li>{sentence(rng, 6)}</li>" for _ in range(rng.randint(2, 5)))
+            parts.append(f"<ul>{items}</ul>")
+        parts.append(f"<p>{paragraph(rng, rng.randint(2, 5))} <strong>{rng.choice(KEYWORDS)}</strong></p>")
+    return "".join(parts)
+
+
+def person_name(rng, honorific=True):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    prefix = rng.choice(HONORIFICS) if honorific else ""
+    return f"{prefix} {name}".strip()
+
+
+def random_date(rng, start_year=2015, end_year=2026):
+    start = datetime(start_year, 1, 1)
+    return start + timedelta(days=rng.randint(0, (end_year - start_year) * 365), hours=rng.randint(8, 18))
+
+
+def image_url(rng, kind):
+    return f"https://images.example.org/{kind}/{rng.randint(1, 5000)}.jpg"
+
+
+def make_person(rng, models):
+    name = person_name(rng)
+    return models.PersonCreate(
+        name=name,
+        title=rng.choice(["Professor", "Associate Professor", "Research Assistant", "PhD Student", "Engineer"]),
+        department=rng.choice(["EEE", "CSE", "Physics", "Mechanical Engineering"]),
+        category=rng.choice(CATEGORIES["people"]),
+        bio=paragraph(rng, 3),
+        research_interests=rng.sample(RESEARCH_AREAS, rng.randint(1, 3)),
+        image=image_url(rng, "people"),
+        email=f"{name.split()[-1].lower()}.{rng.randint(1, 9999)}@example.org",
+        social_links={"google_scholar": "https://scholar.google.com/", "linkedin": "https://linkedin.com/"},
+        display_order=rng.choice([None, rng.randint(1, 100)]),
+    ).dict()
+
+
+def make_publication(rng, models, author_pool):
+    publication_type = rng.choice(CATEGORIES["publication_type"])
+    venue = rng.choice(VENUES)
+    authors = rng.sample(author_pool, rng.randint(1, 6))
+    first_page = rng.randint(1, 900)
+    return models.PublicationCreate(
+        title=f"{rng.choice(TOPIC_WORDS)} {rng.choice(TOPIC_NOUNS)} of {rng.choice(KEYWORDS).title()} "
+              f"for {rng.choice(RESEARCH_AREAS)}",
+        authors=authors,
+        publication_type=publication_type,
+        journal_name=venue if publication_type == "journal" else None,
+        conference_name=venue if publication_type == "conference" else None,
+        book_title=f"Advances in {rng.choice(RESEARCH_AREAS)}" if publication_type == "book_chapter" else None,
+        volume=str(rng.randint(1, 60)) if publication_type == "journal" else None,
+        issue=str(rng.randint(1, 12)) if publication_type == "journal" else None,
+        pages=f"{first_page}-{first_page + rng.randint(5, 20)}",
+        year=rng.randint(2010, 2026),
+        month=rng.choice([None, "January", "March", "June", "September", "December"]),
+        location=rng.choice([None, "Dhaka, Bangladesh", "Singapore", "Berlin, Germany"]),
+        publisher=rng.choice([None, "IEEE", "Elsevier", "Springer"]),
+        keywords=rng.sample(KEYWORDS, rng.randint(2, 6)),
+        link=rng.choice([None, f"https://doi.org/10.{rng.randint(1000, 9999)}/{uuid.UUID(int=rng.getrandbits(128)).hex[:8]}"]),
+        is_open_access=rng.random() < 0.3,
+        citations=int(rng.paretovariate(1.2)) - 1,
+        research_areas=rng.sample(RESEARCH_AREAS, rng.randint(1, 2)),
+    ).dict()
+
+
+def make_project(rng, models, author_pool):
+    start = random_date(rng, 2018, 2026)
+    members = rng.sample(author_pool, rng.randint(2, 8))
+    return models.ProjectCreate(
+        name=f"{rng.choice(TOPIC_WORDS)} {rng.choice(TOPIC_NOUNS)} for {rng.choice(KEYWORDS).title()}",
+        description=paragraph(rng, 4),
+        start_date=start.strftime("%Y-%m-%d"),
+        end_date=(start + timedelta(days=rng.randint(180, 1500))).strftime("%Y-%m-%d"),
+        team_leader=members[0],
+        team_members=", ".join(members[1:]),
+        funded_by=rng.choice([None, "BRAC University", "ICT Division", "World Bank", "UGC Bangladesh"]),
+        total_members=len(members),
+        status=rng.choice(CATEGORIES["project_status"]),
+        research_area=rng.choice(RESEARCH_AREAS),
+        project_link=rng.choice([None, "https://example.org/project"]),
+        image=image_url(rng, "projects"),
+    ).dict()
+
+
+def make_news(rng, models, author_pool):
+    return models.NewsCreate(
+        title=f"{rng.choice(TOPIC_WORDS)} {rng.choice(TOPIC_NOUNS)}: {sentence(rng, 6)[:-1]}",
+        content=rich_text(rng, rng.randint(3, 12)),
+        excerpt=sentence(rng, 25),
+        author=rng.choice(author_pool),
+        published_date=random_date(rng),
+        category=rng.choice(CATEGORIES["news"]),
+        is_featured=rng.random() < 0.1,
+        image=image_url(rng, "news"),
+        image_alt=sentence(rng, 5),
+        tags=rng.sample(KEYWORDS + RESEARCH_AREAS, rng.randint(1, 5)),
+        seo_keywords=", ".join(rng.sample(KEYWORDS, 3)),
+        status="draft" if rng.random() < 0.05 else "published",
+        google_calendar_link=None,
+    ).dict()
+
+
+def make_event(rng, models):
+    date = random_date(rng)
+    return models.EventCreate(
+        title=f"{rng.choice(CATEGORIES['event_type']).title()} on {rng.choice(RESEARCH_AREAS)}",
+        description=paragraph(rng, 3),
+        date=date,
+        end_date=date + timedelta(hours=rng.randint(1, 48)),
+        location=rng.choice(["BRAC University, Dhaka", "Online", "Dhaka, Bangladesh"]),
+        event_type=rng.choice(CATEGORIES["event_type"]),
+        image=image_url(rng, "events"),
+        registration_link=rng.choice([None, "https://example.org/register"]),
+    ).dict()
+
+
+def make_achievement(rng, models):
+    return models.AchievementCreate(
+        title=f"{rng.choice(['Best Paper', 'Research Grant', 'Innovation', 'Excellence'])} Award "
+              f"{rng.randint(2015, 2026)}",
+        description=paragraph(rng, 2),
+        date=random_date(rng),
+        category=rng.choice(CATEGORIES["achievement"]),
+        image=image_url(rng, "achievements"),
+        link=None,
+    ).dict()
+
+
+def make_gallery_item(rng):
+    # Gallery items are free-form dicts in the API; these are the fields PhotoGallery.js reads
+    return {
+        "url": image_url(rng, "gallery"),
+        "title": sentence(rng, 5)[:-1],
+        "category": rng.choice(CATEGORIES["gallery"]),
+    }
+
+
+def parse_scale(scale):
+    return SCALES.get(str(scale).lower()) or int(scale)
+
+
+def generate_dataset(scale, seed=42):
+    """Documents per collection (without ids/timestamps), roughly `scale` in total"""
+    import server_with_changes as models
+
+    rng = random.Random(seed)
+    total = parse_scale(scale)
+    counts = {name: max(1, int(total * share)) for name, share in COLLECTION_SHARES.items()}
+
+    people = [make_person(rng, models) for _ in range(counts["people"])]
+    # Authors mostly come from the group, with some outside co-authors
+    author_pool = [p["name"] for p in people] + [person_name(rng, honorific=False) for _ in range(len(people) * 2)]
+    return {
+        "people": people,
+        "publications": [make_publication(rng, models, author_pool) for _ in range(counts["publications"])],
+        "projects": [make_project(rng, models, author_pool) for _ in range(counts["projects"])],
+        "news": [make_news(rng, models, author_pool) for _ in range(counts["news"])],
+        "events": [make_event(rng, models) for _ in range(counts["events"])],
+        "achievements": [make_achievement(rng, models) for _ in range(counts["achievements"])],
+        "photo_gallery": [make_gallery_item(rng) for _ in range(counts["photo_gallery"])],
+    }
+
+
+def with_storage_fields(dataset, seed=42):
+    """Add the id and timestamps add_document would have set (ISO strings, like the mock store)"""
+    rng = random.Random(seed)
+    stored = {}
+    for collection_name, docs in dataset.items():
+        stored[collection_name] = []
+        for doc in docs:
+            created = random_date(rng, 2020, 2026).isoformat()
+            item = {
+                key: value.isoformat() if isinstance(value, datetime) else value
+                for key, value in doc.items()
+            }
+            item.update(id=uuid.UUID(int=rng.getrandbits(128)).hex, created_at=created, updated_at=created)
+            stored[collection_name].append(item)
+    return stored
+
+
+def to_firestore_value(value):
+    """Datetime-looking strings become timestamps, as add_document stores them"""
+    if isinstance(value, str) and "T" in value and ":" in value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    return value
+
+
+def emulator_reachable(timeout=2.0):
+    """True when FIRESTORE_EMULATOR_HOST is set and the emulator answers on it"""
+    host = os.getenv("FIRESTORE_EMULATOR_HOST")
+    if not host:
+        return False
+    try:
+        with urllib.request.urlopen(f"http://{host}/", timeout=timeout) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def seed_firestore(db, dataset, batch_size=500, clear=True):
+    """Write a with_storage_fields() dataset into Firestore, keeping document IDs"""
+    for collection_name, docs in dataset.items():
+        collection = db.collection(collection_name)
+        if clear:
+            batch, pending = db.batch(), 0
+            for ref in collection.list_documents():
+                batch.delete(ref)
+                pending += 1
+                if pending == batch_size:
+                    batch.commit()
+                    batch, pending = db.batch(), 0
+            if pending:
+                batch.commit()
+
+        batch, pending = db.batch(), 0
+        for doc in docs:
+            data = {key: to_firestore_value(value) for key, value in doc.items() if key != "id"}
+            batch.set(collection.document(doc["id"]), data)
+            pending += 1
+            if pending == batch_size:
+                batch.commit()
+                batch, pending = db.batch(), 0
+        if pending:
+            batch.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="1k", help="1k, 10k, 100k or a document count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="-", help="Output file (default stdout)")
+    parser.add_argument("--firestore", action="store_true",
+                        help="Replace the emulator's collections with the dataset instead of writing JSON")
+    args = parser.parse_args()
+
+    if args.firestore:
+        # Seeding clears the collections first, so it only ever targets an emulator
+        if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+            sys.exit("--firestore needs FIRESTORE_EMULATOR_HOST (seeding clears the collections)")
+        if not emulator_reachable():
+            sys.exit(f"Firestore emulator at {os.getenv('FIRESTORE_EMULATOR_HOST')} is not reachable")
+
+    dataset = with_storage_fields(generate_dataset(args.scale, args.seed), args.seed)
+    if args.firestore:
+        from server_with_changes import get_db
+        seed_firestore(get_db(), dataset)
+        print(f"Seeded {sum(len(docs) for docs in dataset.values())} documents into the emulator")
+    elif args.out == "-":
+        print(json.dumps(dataset))
+    else:
+        with open(args.out, "w") as f:
+            json.dump(dataset, f)
+        print(f"Wrote {sum(len(docs) for docs in dataset.values())} documents to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
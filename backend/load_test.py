@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the API with a realistic traffic mix.
+
+Replays mostly public reads (news and publications dominate, as on the live
+site) with occasional admin writes, either against the in-process app (httpx
+ASGI transport, no server needed) or a running server:
+
+    python load_test.py --concurrency 50 --duration 30 --ramp-up 10
+    python load_test.py --url http://localhost:8001 --concurrency 200 --json results.json
+
+Admin writes log in with ADMIN_USERNAME / ADMIN_PASSWORD (same defaults as the server)
+and delete whatever they create. Reports throughput and p50/p95/p99 per route.
+For production-like tails in-process, set SIMULATED_LATENCY_MS / SIMULATED_JITTER_MS /
+SIMULATED_ERROR_RATE (and FIRESTORE_EMULATOR_HOST to use the emulator instead of mock data).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+import httpx
+
+from bench_stats import percentile
+
+# (weight, route label, method, admin only)
+TRAFFIC_MIX = [
+    (20, "/api/news", "GET", False),
+    (12, "/api/news/{news_id}", "GET", False),
+    (18, "/api/publications", "GET", False),
+    (6, "/api/publications?search", "GET", False),
+    (6, "/api/people", "GET", False),
+    (3, "/api/people/{person_id}/publications", "GET", False),
+    (6, "/api/projects", "GET", False),
+    (5, "/api/research-areas", "GET", False),
+    (3, "/api/research-areas/{area_id}/expanded", "GET", False),
+    (4, "/api/events", "GET", False),
+    (3, "/api/achievements", "GET", False),
+    (3, "/api/photo-gallery", "GET", False),
+    (3, "/api/settings", "GET", False),
+    (4, "/api/search", "GET", False),
+    (2, "/api/autocomplete", "GET", False),
+    (1, "/api/dashboard/stats", "GET", True),
+    (1, "/api/news (create+delete)", "POST", True),
+    (1, "/api/publications/{publication_id}", "PUT", True),
+]
+SEARCH_TERMS = ["grid", "solar", "energy", "storage", "micro", "wind", "smart", "battery"]
+
+
+class LoadTest:
+    def __init__(self, client, token, docs):
+        self.client = client
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.docs = docs  # collection -> documents fetched before the run
+        self.measure_from = 0.0
+        self.latencies = {}  # route label -> [ms]
+        self.statuses = {}  # route label -> {status: count}
+        routes = [entry for entry in TRAFFIC_MIX if token or not entry[3]]
+        self.routes = routes
+        self.weights = [entry[0] for entry in routes]
+
+    def pick_id(self, collection):
+        return random.choice(self.docs[collection])["id"] if self.docs.get(collection) else "missing"
+
+    async def request(self, label):
+        if label == "/api/news/{news_id}":
+            return await self.client.get(f"/api/news/{self.pick_id('news')}")
+        if label == "/api/publications?search":
+            return await self.client.get("/api/publications", params={"search": random.choice(SEARCH_TERMS)})
+        if label == "/api/people/{person_id}/publications":
+            return await self.client.get(f"/api/people/{self.pick_id('people')}/publications")
+        if label == "/api/research-areas/{area_id}/expanded":
+            return await self.client.get(f"/api/research-areas/{self.pick_id('research_areas')}/expanded")
+        if label == "/api/search":
+            return await self.client.get("/api/search", params={"q": random.choice(SEARCH_TERMS)})
+        if label == "/api/autocomplete":
+            return await self.client.get("/api/autocomplete", params={"q": random.choice(SEARCH_TERMS)[:2]})
+        if label == "/api/dashboard/stats":
+            return await self.client.get(label, headers=self.headers)
+        if label == "/api/news (create+delete)":
+            response = await self.client.post("/api/news", headers=self.headers, json={
+                "title": "Load test item", "content": "<p>Load test</p>", "excerpt": "Load test",
+                "author": "load-test", "published_date": "2024-01-01T00:00:00", "status": "draft",
+            })
+            if response.status_code == 200:
+                await self.client.delete(f"/api/news/{response.json()['id']}", headers=self.headers)
+            return response
+        if label == "/api/publications/{publication_id}":
+            if not self.docs.get("publications"):
+                return await self.client.get("/api/publications")
+            # Re-saves an existing publication unchanged
+            existing = random.choice(self.docs["publications"])
+            body = {k: v for k, v in existing.items() if k not in ("id", "created_at", "updated_at")}
+            return await self.client.put(f"/api/publications/{existing['id']}", headers=self.headers, json=body)
+        return await self.client.get(label)
+
+    async def worker(self, start_at, stop_at):
+        await asyncio.sleep(max(0.0, start_at - time.perf_counter()))
+        while time.perf_counter() < stop_at:
+            _, label, _, _ = random.choices(self.routes, weights=self.weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await self.request(label)
+                status_code = response.status_code
+            except Exception as e:
+                # Transport errors, and in-process mode also app exceptions, count as errors
+                status_code = type(e).__name__
+            if start < self.measure_from:
+                continue
+            self.latencies.setdefault(label, []).append((time.perf_counter() - start) * 1000)
+            counts = self.statuses.setdefault(label, {})
+            counts[status_code] = counts.get(status_code, 0) + 1
+
+    async def run(self, concurrency, duration, ramp_up):
+        started = time.perf_counter()
+        self.measure_from = started + ramp_up
+        stop_at = self.measure_from + duration
+        # Workers join evenly over the ramp-up; only the steady state is reported
+        tasks = [
+            asyncio.create_task(self.worker(started + ramp_up * i / max(1, concurrency), stop_at))
+            for i in range(concurrency)
+        ]
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - self.measure_from
+
+    def report(self, elapsed):
+        results = {}
+        for label in sorted(self.latencies, key=lambda l: -len(self.latencies[l])):
+            latencies = self.latencies[label]
+            results[label] = {
+                "requests": len(latencies),
+                "rps": len(latencies) / elapsed,
+                "p50_ms": percentile(latencies, 50),
+                "p95_ms": percentile(latencies, 95),
+                "p99_ms": percentile(latencies, 99),
+                "max_ms": max(latencies),
+                "errors": sum(v for k, v in self.statuses[label].items() if not isinstance(k, int)),
+                "statuses": {str(k): v for k, v in self.statuses[label].items()},
+            }
+        return results
+
+
+async def login(client):
+    response = await client.post("/api/auth/login", json={
+        "username": os.getenv("ADMIN_USERNAME", "admin"),
+        "password": os.getenv("ADMIN_PASSWORD", "@dminsesg705"),
+    })
+    return response.json()["access_token"] if response.status_code == 200 else None
+
+
+async def collect_docs(client):
+    docs = {}
+    for collection, path in [("news", "/api/news"), ("publications", "/api/publications"),
+                             ("people", "/api/people"), ("research_areas", "/api/research-areas")]:
+        response = await client.get(path)
+        docs[collection] = response.json() if response.status_code == 200 else []
+    return docs
+
+
+def make_client(url, concurrency):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if url:
+        return httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0)
+    from server_with_changes import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=30.0)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process app)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of steady-state load")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="Seconds over which workers start")
+    parser.add_argument("--no-writes", action="store_true", help="Skip admin routes")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", help="Write per-route results to this file")
+    args = parser.parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    async with make_client(args.url, args.concurrency) as client:
+        token = None if args.no_writes else await login(client)
+        if not args.no_writes and token is None:
+            print("Admin login failed - running public routes only")
+        test = LoadTest(client, token, await collect_docs(client))
+        elapsed = await test.run(args.concurrency, args.duration, args.ramp_up)
+        results = test.report(elapsed)
+
+    total = sum(r["requests"] for r in results.values())
+    errors = sum(r["errors"] for r in results.values())
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), concurrency {args.concurrency}, "
+          f"{errors} errors\n")
+    print(f"{'route':42} {'reqs':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}  statuses")
+    for label, r in results.items():
+        print(f"{label:42} {r['requests']:7d} {r['rps']:8.1f} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} "
+              f"{r['p99_ms']:8.2f}  {r['statuses']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "target": args.url or "in-process",
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "ramp_up": args.ramp_up,
+                "elapsed": elapsed,
+                "total_requests": total,
+                "errors": errors,
+                "routes": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,32 +1,741 @@
-from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile
+from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile, Request, Form
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, FileResponse, RedirectResponse
+from starlette.datastructures import MutableHeaders
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import os
 from datetime import datetime, timedelta
 import uuid
 import json
-from passlib.context import CryptContext
+import hashlib
+import io
+import base64
+import re
+import html
+import math
+import heapq
+import bisect
+import unicodedata
+from array import array
+import threading
+import time
+import asyncio
+import contextvars
+import random
+import logging
+import logging.handlers
+import queue
+import atexit
+import sys
+import traceback
+import shutil
+from collections import OrderedDict, deque
+from urllib.parse import parse_qsl, quote, urlencode, urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
 from jose import JWTError, jwt
-import requests
 from dotenv import load_dotenv
 
-# Try to import Firebase, but don't fail if it's not available
-try:
-    from google.cloud import firestore
-    FIREBASE_AVAILABLE = True
-    print("Google Cloud Firestore imported successfully")
-except ImportError as e:
-    print(f"Firebase not available: {e}")
-    FIREBASE_AVAILABLE = False
-    firestore = None
-
 load_dotenv()
 
+# Logging - one JSON object per line. Handlers on the request path only put the
+# record on a bounded queue (dropping when it is full); a QueueListener thread
+# does the formatting and the stdout write. LOG_SAMPLE_RATES keeps a fraction
+# of each level, e.g. "DEBUG=0.01,INFO=0.5" (WARNING and above default to 1).
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_RATES = {
+    level.strip().upper(): float(rate)
+    for level, _, rate in (item.partition("=") for item in os.getenv("LOG_SAMPLE_RATES", "").split(","))
+    if level.strip() and rate
+}
+logger = logging.getLogger("sesgrg")
+log_listener = None
+dropped_log_records = 0
+
+class JsonLogFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.utcfromtimestamp(record.created).isoformat(timespec="milliseconds") + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in ("request_id", "route"):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class RequestContextFilter(logging.Filter):
+    """Applies per-level sampling and tags records with the current request (runs in the caller's thread)"""
+
+    def filter(self, record):
+        rate = LOG_SAMPLE_RATES.get(record.levelname, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return False
+        metrics = request_metrics.get()
+        if metrics is not None:
+            record.request_id = metrics.request_id
+            record.route = metrics.route
+        return True
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    def enqueue(self, record):
+        global dropped_log_records
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_log_records += 1
+
+    def prepare(self, record):
+        # Resolve args and tracebacks now; the writer thread only formats JSON
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def configure_logging():
+    global log_listener
+    if log_listener is not None:
+        return
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonLogFormatter())
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    logger.addHandler(queue_handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+    log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+
+configure_logging()
+
+# Firebase - the client library and the client itself are created lazily on
+# first use, so cold starts and endpoints that never touch Firestore skip them.
+# FIRESTORE_EMULATOR_HOST (e.g. "localhost:8080") points the client at a local
+# emulator; the client library reads it itself and needs no credentials then.
+FIRESTORE_PROJECT = os.getenv("FIRESTORE_PROJECT", "sesgrg-website")
+FIRESTORE_EMULATOR_HOST = os.getenv("FIRESTORE_EMULATOR_HOST")
+FIRESTORE_WARMUP = os.getenv("FIRESTORE_WARMUP", "false").lower() == "true"
+firestore = None
+db = None
+firebase_initialized = False
+firebase_init_attempted = False
+firebase_lock = threading.Lock()
+db_init_future = None  # client construction running in the default executor
+
+def get_firestore_module():
+    """Import google.cloud.firestore on first use"""
+    global firestore
+    if firestore is None:
+        from google.cloud import firestore as firestore_module
+        firestore = firestore_module
+    return firestore
+
+def get_db():
+    """Return the shared Firestore client, or None when only mock data is available"""
+    global db, firebase_initialized, firebase_init_attempted
+    if firebase_init_attempted:
+        return db
+    with firebase_lock:
+        if firebase_init_attempted:
+            return db
+        try:
+            db = get_firestore_module().Client(project=FIRESTORE_PROJECT)
+            firebase_initialized = True
+            if FIRESTORE_EMULATOR_HOST:
+                logger.info("Firestore client created for the emulator at %s", FIRESTORE_EMULATOR_HOST)
+            else:
+                logger.info("Direct Firestore client created successfully")
+        except ImportError as e:
+            logger.warning("Firebase libraries not available - using mock data only: %s", e)
+            db = None
+        except Exception as e:
+            logger.warning("Direct Firestore client failed - using mock data only: %s", e)
+            db = None
+        firebase_init_attempted = True
+    return db
+
+def start_db_init():
+    """Build the client in a worker thread (credential discovery can take seconds)"""
+    global db_init_future
+    if db_init_future is None:
+        db_init_future = asyncio.get_running_loop().run_in_executor(None, get_db)
+    return db_init_future
+
+async def ensure_db():
+    """Wait for the client without blocking the event loop; get_db() is then instant"""
+    if not firebase_init_attempted:
+        await asyncio.shield(start_db_init())
+
+# Simulated datastore conditions - for tests, benchmarks and load tests against
+# the emulator or the mock store. Each data-layer call first sleeps for
+# SIMULATED_LATENCY_MS plus an exponentially distributed jitter with mean
+# SIMULATED_JITTER_MS (a long tail, like real round trips), then fails with
+# probability SIMULATED_ERROR_RATE. The sleep blocks the calling thread just as
+# the synchronous Firestore client does. All default to 0 (off).
+SIMULATED_LATENCY_MS = float(os.getenv("SIMULATED_LATENCY_MS", "0"))
+SIMULATED_JITTER_MS = float(os.getenv("SIMULATED_JITTER_MS", "0"))
+SIMULATED_ERROR_RATE = float(os.getenv("SIMULATED_ERROR_RATE", "0"))
+
+class SimulatedDatastoreError(Exception):
+    """Injected in place of a transient Firestore failure"""
+
+def simulate_datastore_call(collection_name, operation):
+    """Apply the configured latency, jitter and error rate to one data-layer call"""
+    if not (SIMULATED_LATENCY_MS or SIMULATED_JITTER_MS or SIMULATED_ERROR_RATE):
+        return
+    delay_ms = SIMULATED_LATENCY_MS
+    if SIMULATED_JITTER_MS:
+        delay_ms += random.expovariate(1.0 / SIMULATED_JITTER_MS)
+    if delay_ms > 0:
+        time.sleep(delay_ms / 1000)
+    if SIMULATED_ERROR_RATE and random.random() < SIMULATED_ERROR_RATE:
+        raise SimulatedDatastoreError(f"Simulated {operation} failure on {collection_name}")
+
+# Request instrumentation - the data layer and hot handlers record phase
+# durations and document counts into a per-request context variable; the
+# middleware turns them into a Server-Timing header and a sampled log line
+REQUEST_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "0.01"))
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+DATA_OPERATION_KINDS = {
+    "query": "read", "get": "read", "get_all": "read",
+    "add": "write", "update": "write", "set": "write",
+    "delete": "delete",
+}
+request_metrics = contextvars.ContextVar("request_metrics", default=None)
+
+class RequestMetrics:
+    """Timings and document counts for one request"""
+    __slots__ = ("scope", "request_id", "phases", "docs")
+
+    def __init__(self, scope=None, request_id=None):
+        self.scope = scope
+        self.request_id = request_id
+        self.phases = {}  # phase -> milliseconds
+        self.docs = {"read": 0, "write": 0, "delete": 0}
+
+    @property
+    def route(self):
+        route = self.scope.get("route") if self.scope is not None else None
+        return route.path if route is not None else "unmatched"
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds * 1000
+
+    def server_timing(self, total_ms):
+        parts = [f"{name};dur={ms:.2f}" for name, ms in self.phases.items()]
+        parts.append(f"total;dur={total_ms:.2f}")
+        parts.append(f'docs;desc="read={self.docs["read"]} write={self.docs["write"]} delete={self.docs["delete"]}"')
+        return ", ".join(parts)
+
+@contextmanager
+def timed_phase(name):
+    """Add the block's duration to the current request's named phase"""
+    metrics = request_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_phase(name, time.perf_counter() - start)
+
+def record_data_call(collection_name, operation, seconds, docs=0, error=False, shape=None):
+    """Called for every Firestore (or mock store) operation made by the data helpers"""
+    metrics = request_metrics.get()
+    if metrics is not None:
+        metrics.add_phase("db", seconds)
+        metrics.docs[DATA_OPERATION_KINDS[operation]] += docs
+    record_data_cost(metrics.route if metrics is not None else "background", operation, shape or collection_name, docs)
+    key = (collection_name, operation)
+    histogram = data_call_latency.get(key)
+    if histogram is None:
+        histogram = data_call_latency[key] = Histogram(LATENCY_BUCKETS)
+    histogram.observe(seconds)
+    if error:
+        data_call_errors[key] = data_call_errors.get(key, 0) + 1
+
+@contextmanager
+def track_data_call(collection_name, operation, docs=0, shape=None):
+    """Time a data-layer call; the block may set call["docs"] once the count is known"""
+    call = {"docs": docs}
+    start = time.perf_counter()
+    error = False
+    try:
+        simulate_datastore_call(collection_name, operation)
+        yield call
+    except Exception:
+        error = True
+        raise
+    finally:
+        record_data_call(collection_name, operation, time.perf_counter() - start, call["docs"], error, shape)
+
+class TimedJSONResponse(JSONResponse):
+    """Default response class - reports JSON encoding as its own phase"""
+
+    def render(self, content):
+        with timed_phase("json"):
+            return super().render(content)
+
+def get_route_name(request):
+    route = request.scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+# Firestore cost accounting - every document read, write and delete is charged
+# to the route and query shape (collection, filter fields, ordering, limit) that
+# made it. Totals are kept per UTC day for COST_RETENTION_DAYS.
+COST_RETENTION_DAYS = int(os.getenv("COST_RETENTION_DAYS", "7"))
+data_costs = {}  # day -> {(route, operation, shape): [calls, reads, writes, deletes]}
+
+def describe_query(collection_name, filters=None, order_by=None, limit=None):
+    """Query shape without values, e.g. "news where status == order_by published_date limit" """
+    parts = [collection_name]
+    if filters:
+        parts.append("where " + " and ".join(f"{field} {operator}" for field, operator, _ in filters))
+    if order_by:
+        parts.append(f"order_by {order_by[0]}")
+    if limit:
+        parts.append("limit")
+    return " ".join(parts)
+
+def record_data_cost(route, operation, shape, docs):
+    day = datetime.utcnow().strftime("%Y-%m-%d")
+    costs = data_costs.get(day)
+    if costs is None:
+        costs = data_costs[day] = {}
+        for old_day in sorted(data_costs)[:-COST_RETENTION_DAYS]:
+            del data_costs[old_day]
+    entry = costs.get((route, operation, shape))
+    if entry is None:
+        entry = costs[(route, operation, shape)] = [0, 0, 0, 0]
+    if operation == "query" and db is not None:
+        docs = max(docs, 1)  # Firestore bills one read for a query that matches nothing
+    entry[0] += 1
+    entry[("read", "write", "delete").index(DATA_OPERATION_KINDS[operation]) + 1] += docs
+
+def get_cost_report(days=1, top=20):
+    """Daily read/write/delete totals plus the most expensive route/query shapes over the last `days` days"""
+    selected = sorted(data_costs)[-days:] if days > 0 else []
+    daily = {}
+    shapes = {}
+    for day in selected:
+        totals = {"calls": 0, "reads": 0, "writes": 0, "deletes": 0}
+        for key, (calls, reads, writes, deletes) in list(data_costs[day].items()):
+            totals["calls"] += calls
+            totals["reads"] += reads
+            totals["writes"] += writes
+            totals["deletes"] += deletes
+            merged = shapes.setdefault(key, [0, 0, 0, 0])
+            for i, value in enumerate((calls, reads, writes, deletes)):
+                merged[i] += value
+        daily[day] = totals
+    # Ordered by billed operations; reads dominate the bill so they break ties
+    ranked = heapq.nlargest(top, shapes.items(), key=lambda item: (item[1][1] + item[1][2] + item[1][3], item[1][1]))
+    return {
+        "storage": "firestore" if get_db() is not None else "mock",
+        "daily": daily,
+        "top": [
+            {
+                "route": route, "operation": operation, "shape": shape,
+                "calls": calls, "reads": reads, "writes": writes, "deletes": deletes,
+                "reads_per_call": round(reads / calls, 2) if calls else 0,
+            }
+            for (route, operation, shape), (calls, reads, writes, deletes) in ranked
+        ],
+    }
+
+def log_request(request, response, total_ms, metrics):
+    if total_ms < SLOW_REQUEST_MS and response.status_code < 500 and random.random() >= REQUEST_LOG_SAMPLE_RATE:
+        return
+    logger.info("request", extra={
+        "request_id": metrics.request_id,
+        "route": get_route_name(request),
+        "fields": {
+            "method": request.method,
+            "status": response.status_code,
+            "latency_ms": round(total_ms, 2),
+            "phases": {name: round(ms, 2) for name, ms in metrics.phases.items()},
+            "docs": metrics.docs,
+        },
+    })
+
+# Metrics - process-wide counters and histograms rendered by /api/metrics in
+# Prometheus text format. Updates are plain dict/list increments (atomic enough
+# under the GIL for monitoring purposes), so there are no locks on the hot path.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+LOOP_LAG_INTERVAL_SECONDS = float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.5"))
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DOCS_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+class Histogram:
+    """Fixed-bucket histogram; bucket counts are stored non-cumulatively"""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels({**labels, 'le': bound})} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {self.sum}")
+        lines.append(f"{name}_count{format_labels(labels)} {self.count}")
+        return lines
+
+route_requests = {}  # (method, route, status) -> count
+route_latency = {}  # (method, route) -> Histogram
+data_call_latency = {}  # (collection, operation) -> Histogram
+data_call_errors = {}  # (collection, operation) -> count
+docs_per_request = Histogram(DOCS_BUCKETS)
+cache_events = {}  # (cache, "hit" | "miss") -> count
+loop_lag = Histogram(LATENCY_BUCKETS)
+requests_in_flight = 0
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in labels.items()) + "}"
+
+def record_cache(cache_name, hit):
+    key = (cache_name, "hit" if hit else "miss")
+    cache_events[key] = cache_events.get(key, 0) + 1
+
+def record_request_metrics(method, route, status_code, seconds, metrics):
+    key = (method, route, status_code)
+    route_requests[key] = route_requests.get(key, 0) + 1
+    histogram = route_latency.get((method, route))
+    if histogram is None:
+        histogram = route_latency[(method, route)] = Histogram(LATENCY_BUCKETS)
+    histogram.observe(seconds)
+    docs_per_request.observe(metrics.docs["read"])
+
+async def run_loop_lag_monitor():
+    """Measure how late the event loop wakes a sleeping task"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL_SECONDS)
+        loop_lag.observe(max(0.0, time.perf_counter() - start - LOOP_LAG_INTERVAL_SECONDS))
+
+def render_metrics():
+    lines = [
+        "# HELP sesg_http_requests_total HTTP requests by route and status",
+        "# TYPE sesg_http_requests_total counter",
+    ]
+    for (method, route, status_code), count in sorted(route_requests.items()):
+        lines.append(f"sesg_http_requests_total{format_labels({'method': method, 'route': route, 'status': status_code})} {count}")
+    lines += ["# HELP sesg_http_request_duration_seconds Request latency by route", "# TYPE sesg_http_request_duration_seconds histogram"]
+    for (method, route), histogram in sorted(route_latency.items()):
+        lines += histogram.render("sesg_http_request_duration_seconds", {"method": method, "route": route})
+    lines += [
+        "# HELP sesg_http_requests_in_flight Requests currently being served",
+        "# TYPE sesg_http_requests_in_flight gauge",
+        f"sesg_http_requests_in_flight {requests_in_flight}",
+        "# HELP sesg_datastore_call_duration_seconds Firestore (or mock store) calls by collection and operation",
+        "# TYPE sesg_datastore_call_duration_seconds histogram",
+    ]
+    for (collection_name, operation), histogram in sorted(data_call_latency.items()):
+        lines += histogram.render("sesg_datastore_call_duration_seconds", {"collection": collection_name, "operation": operation})
+    lines += ["# HELP sesg_datastore_call_errors_total Failed datastore calls", "# TYPE sesg_datastore_call_errors_total counter"]
+    for (collection_name, operation), count in sorted(data_call_errors.items()):
+        lines.append(f"sesg_datastore_call_errors_total{format_labels({'collection': collection_name, 'operation': operation})} {count}")
+    lines += ["# HELP sesg_request_docs_read Documents read per request", "# TYPE sesg_request_docs_read histogram"]
+    lines += docs_per_request.render("sesg_request_docs_read", {})
+    lines += ["# HELP sesg_cache_requests_total Cache lookups by cache and result", "# TYPE sesg_cache_requests_total counter"]
+    for (cache_name, result), count in sorted(cache_events.items()):
+        lines.append(f"sesg_cache_requests_total{format_labels({'cache': cache_name, 'result': result})} {count}")
+    lines += ["# HELP sesg_cache_hit_ratio Hits / lookups per cache", "# TYPE sesg_cache_hit_ratio gauge"]
+    for cache_name in sorted({cache for cache, _ in cache_events}):
+        hits = cache_events.get((cache_name, "hit"), 0)
+        total = hits + cache_events.get((cache_name, "miss"), 0)
+        lines.append(f"sesg_cache_hit_ratio{format_labels({'cache': cache_name})} {hits / total if total else 0}")
+    lines += ["# HELP sesg_event_loop_lag_seconds Event loop wake-up delay", "# TYPE sesg_event_loop_lag_seconds histogram"]
+    lines += loop_lag.render("sesg_event_loop_lag_seconds", {})
+    lines += ["# HELP sesg_event_loop_blocks_total Loop stalls over BLOCKING_THRESHOLD_MS by route", "# TYPE sesg_event_loop_blocks_total counter"]
+    for route, count in sorted(loop_blocks.items()):
+        lines.append(f"sesg_event_loop_blocks_total{format_labels({'route': route})} {count}")
+    lines += [
+        "# HELP sesg_log_records_dropped_total Log records dropped because the log queue was full",
+        "# TYPE sesg_log_records_dropped_total counter",
+        f"sesg_log_records_dropped_total {dropped_log_records}",
+    ]
+    return "\n".join(lines) + "\n"
+
+# Event-loop blocking detector - a heartbeat task on the loop plus a watchdog
+# thread. When the heartbeat stalls for longer than BLOCKING_THRESHOLD_MS the
+# watchdog captures the loop thread's stack and names the route whose handler
+# is on it. "production" takes one stack per stall; "debug" keeps sampling the
+# stack while the stall lasts and turns on asyncio's slow-callback logging.
+BLOCKING_DETECTOR = os.getenv("BLOCKING_DETECTOR", "off").lower()  # off, production, debug
+BLOCKING_THRESHOLD_MS = float(os.getenv("BLOCKING_THRESHOLD_MS", "100"))
+BLOCKING_DEBUG_SAMPLES = 20
+BLOCKING_STACK_DEPTH = 30
+blocking_reports = deque(maxlen=50)
+loop_blocks = {}  # route -> stall count
+loop_heartbeat = 0.0
+endpoint_routes = None  # endpoint code object -> route path
+
+def get_endpoint_routes():
+    global endpoint_routes
+    if endpoint_routes is None:
+        endpoint_routes = {
+            route.endpoint.__code__: route.path
+            for route in app.routes if hasattr(getattr(route, "endpoint", None), "__code__")
+        }
+    return endpoint_routes
+
+def find_route_in_stack(frame):
+    routes = get_endpoint_routes()
+    while frame is not None:
+        if frame.f_code in routes:
+            return routes[frame.f_code]
+        frame = frame.f_back
+    return None
+
+def format_loop_stack(frame):
+    return [line.rstrip() for line in traceback.format_stack(frame, limit=BLOCKING_STACK_DEPTH)]
+
+async def run_loop_heartbeat(interval):
+    global loop_heartbeat
+    while True:
+        loop_heartbeat = time.monotonic()
+        await asyncio.sleep(interval)
+
+def run_loop_watchdog(loop_thread_id, interval, stop_event):
+    """Watch the heartbeat from a separate thread and record stalls"""
+    report = None
+    while not stop_event.wait(interval):
+        stalled_ms = (time.monotonic() - loop_heartbeat - interval) * 1000
+        if stalled_ms < BLOCKING_THRESHOLD_MS:
+            if report is not None:
+                finish_block_report(report)
+                report = None
+            continue
+        frame = sys._current_frames().get(loop_thread_id)
+        if frame is None:
+            continue
+        if report is None:
+            route = find_route_in_stack(frame) or "unknown"
+            report = {
+                "route": route,
+                "started_at": datetime.utcnow().isoformat(),
+                "duration_ms": stalled_ms,
+                "stack": format_loop_stack(frame),
+                "samples": [],
+            }
+            loop_blocks[route] = loop_blocks.get(route, 0) + 1
+        else:
+            report["duration_ms"] = stalled_ms
+            if BLOCKING_DETECTOR == "debug" and len(report["samples"]) < BLOCKING_DEBUG_SAMPLES:
+                report["samples"].append(format_loop_stack(frame)[-5:])
+        del frame
+
+def finish_block_report(report):
+    report["duration_ms"] = round(report["duration_ms"], 1)
+    blocking_reports.append(report)
+    logger.warning("loop_blocked", extra={
+        "route": report["route"],
+        "fields": {"duration_ms": report["duration_ms"], "stack": report["stack"][-8:]},
+    })
+
+def start_blocking_detector(loop):
+    """Start heartbeat and watchdog; returns a callable that stops both"""
+    global loop_heartbeat
+    interval = BLOCKING_THRESHOLD_MS / 4000
+    # Otherwise a watchdog check before the first beat sees a stall as long as the process uptime
+    loop_heartbeat = time.monotonic()
+    if BLOCKING_DETECTOR == "debug":
+        loop.set_debug(True)
+        loop.slow_callback_duration = BLOCKING_THRESHOLD_MS / 1000
+    heartbeat_task = asyncio.create_task(run_loop_heartbeat(interval))
+    stop_event = threading.Event()
+    watchdog = threading.Thread(
+        target=run_loop_watchdog, args=(threading.get_ident(), interval, stop_event),
+        name="loop-watchdog", daemon=True
+    )
+    watchdog.start()
+
+    def stop():
+        stop_event.set()
+        heartbeat_task.cancel()
+    return stop
+
+# On-demand profiling - an admin adds ?__profile=1 (or "X-Profile: 1") to any
+# request and a sampling thread records the event loop's stacks while it runs.
+# Profiles are kept in memory in collapsed-stack format ("a;b;c 12"), which
+# flamegraph.pl, inferno and speedscope read directly. Requests without the flag
+# only pay for the flag check.
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "1"))
+PROFILES_MAX = 20
+profiles = OrderedDict()  # profile id -> profile dict
+active_profiles = 0
+default_switch_interval = sys.getswitchinterval()
+
+def wants_profile(request):
+    return b"__profile=1" in request.scope.get("query_string", b"") or request.headers.get("x-profile") == "1"
+
+def get_profiling_user(request):
+    """The admin user behind the request's bearer token, or None"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        user = get_current_user(HTTPAuthorizationCredentials(scheme=scheme, credentials=token))
+    except HTTPException:
+        return None
+    return user if user["role"] == "admin" else None
+
+def sample_stacks(thread_id, stop_event, counts):
+    interval = PROFILE_SAMPLE_INTERVAL_MS / 1000
+    while not stop_event.wait(interval):
+        frame = sys._current_frames().get(thread_id)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        key = ";".join(reversed(stack))
+        counts[key] = counts.get(key, 0) + 1
+
+def store_profile(request, duration_ms, counts):
+    profile_id = uuid.uuid4().hex[:12]
+    profiles[profile_id] = {
+        "id": profile_id,
+        "method": request.method,
+        "path": request.url.path,
+        "route": get_route_name(request),
+        "created_at": datetime.utcnow().isoformat(),
+        "duration_ms": round(duration_ms, 2),
+        "samples": sum(counts.values()),
+        "collapsed": "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items())),
+    }
+    while len(profiles) > PROFILES_MAX:
+        profiles.popitem(last=False)
+    return profile_id
+
+@asynccontextmanager
+async def lifespan(app):
+    if FIRESTORE_WARMUP:
+        # Long-lived servers can build the client in the background after startup
+        start_db_init()
+    media_gc_task = asyncio.create_task(run_media_gc_loop()) if MEDIA_GC_INTERVAL_SECONDS > 0 else None
+    area_reconcile_task = asyncio.create_task(run_area_reconcile_loop()) if AREA_RECONCILE_INTERVAL_SECONDS > 0 else None
+    loop_lag_task = asyncio.create_task(run_loop_lag_monitor()) if LOOP_LAG_INTERVAL_SECONDS > 0 else None
+    stop_blocking_detector = None
+    if BLOCKING_DETECTOR in ("production", "debug"):
+        stop_blocking_detector = start_blocking_detector(asyncio.get_running_loop())
+    yield
+    if stop_blocking_detector is not None:
+        stop_blocking_detector()
+    if loop_lag_task is not None:
+        loop_lag_task.cancel()
+    if media_gc_task is not None:
+        media_gc_task.cancel()
+    if area_reconcile_task is not None:
+        area_reconcile_task.cancel()
+    if db is not None:
+        db.close()
+    password_executor.shutdown(wait=False)
+    if image_executor is not None:
+        image_executor.shutdown(wait=False)
+
 # Initialize FastAPI
-app = FastAPI(title="SESGRG API", version="1.0.0")
+app = FastAPI(title="SESGRG API", version="1.0.0", lifespan=lifespan, default_response_class=TimedJSONResponse)
+
+# Innermost: the first request that may touch Firestore waits for the client
+# off the event loop instead of building it synchronously inside its handler
+DB_INIT_EXEMPT_PATHS = {"/api/health", "/api/metrics"}
+
+@app.middleware("http")
+async def db_init_middleware(request: Request, call_next):
+    if not firebase_init_attempted and request.url.path not in DB_INIT_EXEMPT_PATHS:
+        with timed_phase("db_init"):
+            await ensure_db()
+    return await call_next(request)
+
+# Registered before CORS so snapshot responses still get CORS headers
+@app.middleware("http")
+async def snapshot_middleware(request: Request, call_next):
+    snapshot_response = serve_snapshot(request) if SNAPSHOT_MODE else None
+    return snapshot_response or await call_next(request)
+
+class ProfilingMiddleware:
+    """Pure ASGI: requests without the profile flag go straight through to the app"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request = Request(scope)
+        if not wants_profile(request) or get_profiling_user(request) is None:
+            return await self.app(scope, receive, send)
+
+        # Samples the loop thread, so concurrent requests show up in the profile too.
+        # The GIL switch interval is lowered meanwhile so the sampler gets to run.
+        global active_profiles
+        active_profiles += 1
+        sys.setswitchinterval(min(default_switch_interval, PROFILE_SAMPLE_INTERVAL_MS / 2000))
+        counts = {}
+        stop_event = threading.Event()
+        sampler = threading.Thread(
+            target=sample_stacks, args=(threading.get_ident(), stop_event, counts),
+            name="profiler", daemon=True
+        )
+        start = time.perf_counter()
+
+        def stop_sampler():
+            global active_profiles
+            if stop_event.is_set():
+                return
+            stop_event.set()
+            sampler.join()
+            active_profiles -= 1
+            if active_profiles == 0:
+                sys.setswitchinterval(default_switch_interval)
+
+        async def send_with_profile(message):
+            # The profile covers the handler up to the response start, where its headers go out
+            if message["type"] == "http.response.start":
+                stop_sampler()
+                profile_id = store_profile(request, (time.perf_counter() - start) * 1000, counts)
+                headers = MutableHeaders(scope=message)
+                headers["X-Profile-Id"] = profile_id
+                headers["X-Profile-Url"] = f"/api/admin/profiles/{profile_id}"
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            stop_sampler()
+
+app.add_middleware(ProfilingMiddleware)
 
 # CORS Configuration
 app.add_middleware(
@@ -37,39 +746,73 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Firebase
-db = None
-firebase_initialized = False
-
-if FIREBASE_AVAILABLE:
+# Outermost, so the timings cover snapshot serving and CORS as well
+@app.middleware("http")
+async def instrumentation_middleware(request: Request, call_next):
+    global requests_in_flight
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    metrics = RequestMetrics(request.scope, request_id[:64])
+    token = request_metrics.set(metrics)
+    requests_in_flight += 1
+    start = time.perf_counter()
     try:
-        # Try direct client initialization
-        db = firestore.Client(project="sesgrg-website")
-        firebase_initialized = True
-        print("Direct Firestore client created successfully")
-    except Exception as e:
-        print(f"Direct Firestore client failed: {e}")
-        print("Firebase will be unavailable - using mock data only")
-        db = None
-        firebase_initialized = False
-else:
-    print("Firebase libraries not available - using mock data only")
-    db = None
-    firebase_initialized = False
+        response = await call_next(request)
+    finally:
+        requests_in_flight -= 1
+        request_metrics.reset(token)
+    total_ms = (time.perf_counter() - start) * 1000
+    record_request_metrics(request.method, get_route_name(request), response.status_code, total_ms / 1000, metrics)
+    response.headers["Server-Timing"] = metrics.server_timing(total_ms)
+    response.headers["Timing-Allow-Origin"] = "*"
+    response.headers["X-Request-ID"] = metrics.request_id
+    log_request(request, response, total_ms, metrics)
+    return response
 
 # Security
 SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = None  # built on first use by get_pwd_context()
 security = HTTPBearer()
 
+# Verified token cache - avoids re-running jwt.decode for every admin request
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+token_cache = OrderedDict()  # token hash -> (user dict, exp timestamp)
+revoked_tokens = {}  # token hash -> exp timestamp
+token_cache_lock = threading.Lock()
+
+# Password hashing/verification runs in its own small pool so bcrypt never blocks the event loop.
+# At most PASSWORD_MAX_PENDING tasks may be queued or running; beyond that callers get a 503,
+# so attempts spread over many IPs cannot pile up unbounded hashing work.
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", "16"))
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="password")
+password_tasks_pending = 0
+
+# Per-IP token bucket for the login route
+LOGIN_RATE_BURST = float(os.getenv("LOGIN_RATE_BURST", "5"))
+LOGIN_RATE_PER_MINUTE = float(os.getenv("LOGIN_RATE_PER_MINUTE", "10"))
+LOGIN_BUCKETS_MAX = 10000
+# Only enable behind a proxy that appends the client address to X-Forwarded-For;
+# TRUSTED_PROXY_HOPS is how many such proxies sit in front of the app
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "false").lower() == "true"
+TRUSTED_PROXY_HOPS = max(1, int(os.getenv("TRUSTED_PROXY_HOPS", "1")))
+login_buckets = {}  # ip -> (tokens, last refill time)
+
+# User store - Firestore "users" collection, falling back to the env-configured admin
+in_memory_users = {}
+dummy_password_hash = None
+
 def get_collection_data(collection_name, filters=None, order_by=None, limit=None):
     """Get data from Firestore collection with optional filtering"""
     try:
-        if db is None or not firebase_initialized:
-            return get_mock_data(collection_name)
+        db = get_db()
+        if db is None:
+            with track_data_call(collection_name, "query", shape=describe_query(collection_name, filters, order_by, limit)) as call:
+                data = get_mock_data(collection_name)
+                call["docs"] = len(data)
+            return data
         
         ref = db.collection(collection_name)
         
@@ -81,37 +824,52 @@ def get_collection_data(collection_name, filters=None, order_by=None, limit=None
         # Apply ordering
         if order_by:
             field, direction = order_by
-            if FIREBASE_AVAILABLE and firestore:
-                ref = ref.order_by(field, direction=direction)
+            ref = ref.order_by(field, direction=direction)
         
         # Apply limit
         if limit:
             ref = ref.limit(limit)
         
-        docs = ref.stream()
+        shape = describe_query(collection_name, filters, order_by, limit)
         data = []
-        for doc in docs:
-            doc_data = doc.to_dict()
-            doc_data['id'] = doc.id
-            # Convert datetime objects to ISO strings
-            for key, value in doc_data.items():
-                if hasattr(value, 'isoformat'):
-                    doc_data[key] = value.isoformat()
-            data.append(doc_data)
+        convert_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            simulate_datastore_call(collection_name, "query")
+            for doc in ref.stream():
+                convert_start = time.perf_counter()
+                doc_data = doc.to_dict()
+                doc_data['id'] = doc.id
+                # Convert datetime objects to ISO strings
+                for key, value in doc_data.items():
+                    if hasattr(value, 'isoformat'):
+                        doc_data[key] = value.isoformat()
+                data.append(doc_data)
+                convert_seconds += time.perf_counter() - convert_start
+        except Exception:
+            record_data_call(collection_name, "query", time.perf_counter() - start - convert_seconds, len(data), True, shape)
+            raise
+        record_data_call(collection_name, "query", time.perf_counter() - start - convert_seconds, len(data), shape=shape)
+        metrics = request_metrics.get()
+        if metrics is not None:
+            metrics.add_phase("convert", convert_seconds)
         
         return data
     except Exception as e:
-        print(f"Error getting collection data: {e}")
+        logger.error("Error getting collection data: %s", e)
         return get_mock_data(collection_name)
 
 def add_document(collection_name, data):
     """Add document to Firestore collection"""
     try:
+        db = get_db()
         if db is None:
             # Mock behavior - add to in-memory storage
             data['id'] = str(uuid.uuid4())
             data['created_at'] = datetime.utcnow().isoformat()
-            in_memory_db[collection_name].append(data)
+            with track_data_call(collection_name, "add", docs=1):
+                in_memory_db[collection_name].append(data)
+            notify_collection_changed(collection_name, data['id'], data)
             return data
         
         # Add timestamp
@@ -126,7 +884,8 @@ def add_document(collection_name, data):
                 except:
                     pass
         
-        doc_ref = db.collection(collection_name).add(data)
+        with track_data_call(collection_name, "add", docs=1):
+            doc_ref = db.collection(collection_name).add(data)
         doc_id = doc_ref[1].id
         
         # Return the created document
@@ -135,20 +894,24 @@ def add_document(collection_name, data):
         created_doc['created_at'] = created_doc['created_at'].isoformat()
         created_doc['updated_at'] = created_doc['updated_at'].isoformat()
         
+        notify_collection_changed(collection_name, doc_id, created_doc)
         return created_doc
     except Exception as e:
-        print(f"Error adding document: {e}")
+        logger.error("Error adding document: %s", e)
         raise HTTPException(status_code=500, detail=f"Error creating document: {str(e)}")
 
 def update_document(collection_name, doc_id, data):
     """Update document in Firestore collection"""
     try:
+        db = get_db()
         if db is None:
             # Mock behavior - update in-memory storage
             for item in in_memory_db[collection_name]:
                 if item['id'] == doc_id:
-                    item.update(data)
+                    with track_data_call(collection_name, "update", docs=1):
+                        item.update(data)
                     item['updated_at'] = datetime.utcnow().isoformat()
+                    notify_collection_changed(collection_name, doc_id, item)
                     return item
             raise HTTPException(status_code=404, detail="Document not found")
         
@@ -163,45 +926,117 @@ def update_document(collection_name, doc_id, data):
                     pass
         
         doc_ref = db.collection(collection_name).document(doc_id)
-        if not doc_ref.get().exists:
+        with track_data_call(collection_name, "get", docs=1):
+            exists = doc_ref.get().exists
+        if not exists:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        doc_ref.update(data)
+        with track_data_call(collection_name, "update", docs=1):
+            doc_ref.update(data)
         
         # Return updated document
-        updated_doc = doc_ref.get().to_dict()
+        with track_data_call(collection_name, "get", docs=1):
+            updated_doc = doc_ref.get().to_dict()
         updated_doc['id'] = doc_id
         for key, value in updated_doc.items():
             if hasattr(value, 'isoformat'):
                 updated_doc[key] = value.isoformat()
         
+        notify_collection_changed(collection_name, doc_id, updated_doc)
         return updated_doc
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error updating document: {e}")
+        logger.error("Error updating document: %s", e)
         raise HTTPException(status_code=500, detail=f"Error updating document: {str(e)}")
 
 def delete_document(collection_name, doc_id):
     """Delete document from Firestore collection"""
     try:
+        db = get_db()
         if db is None:
             # Mock behavior - delete from in-memory storage
-            in_memory_db[collection_name] = [item for item in in_memory_db[collection_name] if item['id'] != doc_id]
+            with track_data_call(collection_name, "delete", docs=1):
+                in_memory_db[collection_name] = [item for item in in_memory_db[collection_name] if item['id'] != doc_id]
+            notify_collection_changed(collection_name, doc_id)
             return {"message": "Document deleted successfully"}
         
         doc_ref = db.collection(collection_name).document(doc_id)
-        if not doc_ref.get().exists:
+        with track_data_call(collection_name, "get", docs=1):
+            exists = doc_ref.get().exists
+        if not exists:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        doc_ref.delete()
+        with track_data_call(collection_name, "delete", docs=1):
+            doc_ref.delete()
+        notify_collection_changed(collection_name, doc_id)
         return {"message": "Document deleted successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error deleting document: {e}")
+        logger.error("Error deleting document: %s", e)
         raise HTTPException(status_code=500, detail=f"Error deleting document: {str(e)}")
 
+def get_document(collection_name, doc_id):
+    """Get a single document by ID, or None if it doesn't exist"""
+    db = get_db()
+    if db is None:
+        return next((item for item in in_memory_db.get(collection_name, []) if item.get('id') == doc_id), None)
+    
+    with track_data_call(collection_name, "get", docs=1):
+        doc = db.collection(collection_name).document(doc_id).get()
+    if not doc.exists:
+        return None
+    doc_data = doc.to_dict()
+    doc_data['id'] = doc.id
+    for key, value in doc_data.items():
+        if hasattr(value, 'isoformat'):
+            doc_data[key] = value.isoformat()
+    return doc_data
+
+def get_documents(collection_name, doc_ids):
+    """Get several documents by ID in one round trip, skipping missing ones"""
+    if not doc_ids:
+        return []
+    db = get_db()
+    if db is None:
+        wanted = set(doc_ids)
+        return [item for item in in_memory_db.get(collection_name, []) if item.get('id') in wanted]
+    
+    refs = [db.collection(collection_name).document(doc_id) for doc_id in doc_ids]
+    documents = []
+    with track_data_call(collection_name, "get_all", docs=len(refs)):
+        snapshots = list(db.get_all(refs))
+    for doc in snapshots:
+        if not doc.exists:
+            continue
+        doc_data = doc.to_dict()
+        doc_data['id'] = doc.id
+        for key, value in doc_data.items():
+            if hasattr(value, 'isoformat'):
+                doc_data[key] = value.isoformat()
+        documents.append(doc_data)
+    return documents
+
+# Write hooks - features that keep derived state (snapshots, indexes, counters)
+# in sync register hook(collection_name, doc_id, doc) here
+write_hooks = []
+# Set by run_data_call_in_thread so hooks that schedule asyncio work can reach the loop
+hook_loop = contextvars.ContextVar("hook_loop", default=None)
+
+async def run_data_call_in_thread(func, *args):
+    """Run a blocking data helper off the event loop; its write hooks can still schedule on this loop"""
+    hook_loop.set(asyncio.get_running_loop())
+    return await asyncio.to_thread(func, *args)
+
+def notify_collection_changed(collection_name, doc_id=None, doc=None):
+    """Called by the write helpers after every successful write (doc is None for deletes)"""
+    for hook in write_hooks:
+        try:
+            hook(collection_name, doc_id, doc)
+        except Exception as e:
+            logger.error("Error running write hook %s: %s", hook.__name__, e, exc_info=True)
+
 def get_mock_data(collection_name):
     """Get mock data for development"""
     return in_memory_db.get(collection_name, [])
@@ -348,6 +1183,1597 @@ in_memory_db = {
     }
 }
 
+# Static snapshots - public GET responses pre-rendered to versioned JSON files.
+# export_snapshots.py writes them into the frontend build; with SNAPSHOT_MODE=true
+# the API serves them directly and re-renders the affected files after admin writes.
+SNAPSHOT_MODE = os.getenv("SNAPSHOT_MODE", "false").lower() == "true"
+SNAPSHOT_DIR = os.getenv(
+    "SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend", "build", "snapshots")
+)
+SNAPSHOT_COLLECTIONS = {
+    "research-areas": "research_areas",
+    "people": "people",
+    "publications": "publications",
+    "projects": "projects",
+    "achievements": "achievements",
+    "news": "news",
+    "events": "events",
+    "photo-gallery": "photo_gallery",
+    "settings": "settings",
+}
+PEOPLE_CATEGORIES = ["advisor", "team_member", "collaborator"]
+snapshot_manifest = None  # {"version": ..., "files": {key: {"file": ..., "etag": ...}}}
+snapshot_bodies = {}  # key -> response bytes
+dirty_snapshot_keys = set()
+snapshot_regen_tasks = {}  # collection -> running asyncio.Task
+snapshot_regen_pending = set()
+
+def snapshot_key(path, query_string=""):
+    """Canonical key for a public GET, e.g. /api/people?category=advisor"""
+    params = sorted(parse_qsl(query_string))
+    return path + ("?" + urlencode(params) if params else "")
+
+def snapshot_filename(key):
+    path, _, query = key.partition("?")
+    filename = path[len("/api/"):]
+    if query:
+        filename += "@" + query
+    return filename + ".json"
+
+def snapshot_collection(key):
+    return SNAPSHOT_COLLECTIONS.get(key[len("/api/"):].split("?")[0].split("/")[0])
+
+def snapshot_targets(collection_name=None):
+    """Snapshot keys for every public GET, optionally only those reading one collection"""
+    keys = []
+    for prefix, collection in SNAPSHOT_COLLECTIONS.items():
+        if collection_name not in (None, collection):
+            continue
+        keys.append(f"/api/{prefix}")
+        if prefix == "research-areas":
+            keys += [f"/api/research-areas/{area['id']}" for area in get_collection_data("research_areas")]
+        elif prefix == "news":
+            keys += [f"/api/news/{item['id']}" for item in get_collection_data("news")]
+        elif prefix == "people":
+            categories = set(PEOPLE_CATEGORIES)
+            categories.update(p["category"] for p in get_collection_data("people") if p.get("category"))
+            keys += [snapshot_key("/api/people", urlencode({"category": c})) for c in sorted(categories)]
+    if collection_name in AREA_COUNT_COLLECTIONS:
+        # The research area listing embeds publication/project counts
+        keys.append("/api/research-areas")
+    return keys
+
+async def render_api_get(key):
+    """Run a GET through the app in-process and return (status code, body bytes)"""
+    path, _, query = key.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"snapshot"), (b"x-snapshot-render", b"1")],
+        "client": ("127.0.0.1", 0),
+        "server": ("snapshot", 80),
+    }
+    response = {"status": 500, "body": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], b"".join(response["body"])
+
+def write_json_atomic(filepath, data):
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data if isinstance(data, bytes) else json.dumps(data, indent=2).encode())
+    os.replace(tmp_path, filepath)
+
+def write_snapshot(version_dir, key, body):
+    filename = snapshot_filename(key)
+    write_json_atomic(os.path.join(version_dir, filename), body)
+    return {"file": filename, "etag": hashlib.sha256(body).hexdigest()[:16]}
+
+async def export_snapshots(out_dir=None, version=None):
+    """Render every public GET into <out_dir>/<version>/ and point latest.json at it"""
+    out_dir = out_dir or SNAPSHOT_DIR
+    version = version or datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    version_dir = os.path.join(out_dir, version)
+
+    files = {}
+    for key in snapshot_targets():
+        status_code, body = await render_api_get(key)
+        if status_code == 200:
+            files[key] = write_snapshot(version_dir, key, body)
+        else:
+            logger.warning("Skipping snapshot %s: status %s", key, status_code)
+
+    manifest = {"version": version, "generated_at": datetime.utcnow().isoformat(), "files": files}
+    write_json_atomic(os.path.join(version_dir, "manifest.json"), manifest)
+    write_json_atomic(os.path.join(out_dir, "latest.json"), manifest)
+    return manifest
+
+def load_snapshot_manifest():
+    global snapshot_manifest
+    if snapshot_manifest is None:
+        try:
+            with open(os.path.join(SNAPSHOT_DIR, "latest.json")) as f:
+                snapshot_manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error("Error loading snapshot manifest: %s", e)
+            snapshot_manifest = {"version": None, "files": {}}
+    return snapshot_manifest
+
+def get_snapshot(key):
+    """Return (body, etag) for a clean snapshot, or None to fall through to the live handler"""
+    if key in dirty_snapshot_keys:
+        return None
+    manifest = load_snapshot_manifest()
+    entry = manifest["files"].get(key)
+    if entry is None:
+        return None
+    body = snapshot_bodies.get(key)
+    if body is None:
+        try:
+            with open(os.path.join(SNAPSHOT_DIR, manifest["version"], entry["file"]), "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+        snapshot_bodies[key] = body
+    return body, entry["etag"]
+
+def serve_snapshot(request: Request):
+    if request.method != "GET" or not request.url.path.startswith("/api/") or "x-snapshot-render" in request.headers:
+        return None
+    snapshot = get_snapshot(snapshot_key(request.url.path, request.url.query))
+    record_cache("snapshot", snapshot is not None)
+    if snapshot is None:
+        return None
+    body, etag = snapshot
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "public, max-age=0, must-revalidate"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def link_snapshot_file(src_dir, dst_dir, filename):
+    """Carry an unchanged file into a new version; hard link where possible"""
+    dst = os.path.join(dst_dir, filename)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try:
+        os.link(os.path.join(src_dir, filename), dst)
+    except OSError:
+        shutil.copyfile(os.path.join(src_dir, filename), dst)
+
+def publish_snapshot_version(collection_name, rendered):
+    """Write a new version dir from the current one plus re-rendered keys and switch latest.json to it"""
+    global snapshot_manifest
+    current = load_snapshot_manifest()
+    current_dir = os.path.join(SNAPSHOT_DIR, current["version"])
+    version = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+    version_dir = os.path.join(SNAPSHOT_DIR, version)
+
+    files = {}
+    manifest = {"version": version, "generated_at": datetime.utcnow().isoformat(), "files": files}
+    try:
+        for key, entry in current["files"].items():
+            # Keys no longer rendered are detail pages of deleted documents
+            if key in rendered or snapshot_collection(key) == collection_name:
+                continue
+            try:
+                link_snapshot_file(current_dir, version_dir, entry["file"])
+            except FileNotFoundError:
+                continue  # served live until the next export
+            files[key] = entry
+        for key, body in rendered.items():
+            if body is not None:
+                files[key] = write_snapshot(version_dir, key, body)
+        write_json_atomic(os.path.join(version_dir, "manifest.json"), manifest)
+        write_json_atomic(os.path.join(SNAPSHOT_DIR, "latest.json"), manifest)
+    except OSError:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    snapshot_manifest = manifest
+    for key, body in rendered.items():
+        if body is None:
+            snapshot_bodies.pop(key, None)
+        else:
+            snapshot_bodies[key] = body
+
+async def regenerate_snapshots(collection_name):
+    """Re-render the snapshot files that read from one collection into a new version"""
+    while True:
+        snapshot_regen_pending.discard(collection_name)
+        if load_snapshot_manifest()["version"] is None:
+            return
+
+        rendered = {}  # key -> body, or None when the page no longer renders
+        for key in snapshot_targets(collection_name):
+            status_code, body = await render_api_get(key)
+            rendered[key] = body if status_code == 200 else None
+
+        # Published versions are never modified; files are only read from the one latest.json names
+        publish_snapshot_version(collection_name, rendered)
+        if collection_name not in snapshot_regen_pending:
+            # A write during the render keeps its keys dirty until the next pass
+            dirty_snapshot_keys.difference_update(
+                [k for k in dirty_snapshot_keys if k in rendered or snapshot_collection(k) == collection_name]
+            )
+            return
+
+async def run_snapshot_regeneration(collection_name):
+    # Fire-and-forget task: on failure (e.g. a read-only filesystem) the keys stay dirty,
+    # are served live, and the next write to the collection retries
+    try:
+        await regenerate_snapshots(collection_name)
+    except Exception as e:
+        logger.error("Error regenerating %s snapshots: %s", collection_name, e, exc_info=True)
+
+def schedule_snapshot_regeneration(collection_name):
+    manifest = load_snapshot_manifest()
+    dirty_snapshot_keys.update(k for k in manifest["files"] if snapshot_collection(k) == collection_name)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        if hook_loop.get() is not None:
+            hook_loop.get().call_soon_threadsafe(schedule_snapshot_regeneration, collection_name)
+        return  # no loop (e.g. a script) - dirty keys are served live until the next export
+
+    running = snapshot_regen_tasks.get(collection_name)
+    if running is not None and not running.done():
+        snapshot_regen_pending.add(collection_name)
+        return
+    snapshot_regen_tasks[collection_name] = loop.create_task(run_snapshot_regeneration(collection_name))
+
+def snapshot_write_hook(collection_name, doc_id, doc):
+    if SNAPSHOT_MODE:
+        schedule_snapshot_regeneration(collection_name)
+
+write_hooks.append(snapshot_write_hook)
+
+# Media uploads - files are streamed to MEDIA_DIR, resized into WebP/JPEG variants
+# in a process pool and either served from /api/media or pushed to MEDIA_BUCKET
+# (Cloud Storage; required on Vercel where the filesystem is read-only)
+MEDIA_DIR = os.getenv("MEDIA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "media"))
+MEDIA_BUCKET = os.getenv("MEDIA_BUCKET")
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL")
+MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_MB", "20")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+IMAGE_VARIANT_WIDTHS = [320, 640, 1024, 1600]
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+IMAGE_COLLECTIONS = ["people", "projects", "news", "photo_gallery"]
+ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/png", "image/webp", "image/gif"]
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MEDIA_PUBLIC_DIRS = ["images", "pdfs"]  # originals and in-progress uploads stay private
+image_executor = None
+storage_bucket = None
+
+def get_image_executor():
+    global image_executor
+    if image_executor is None:
+        image_executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return image_executor
+
+def resolve_media_path(media_path):
+    """Real path of a public file under MEDIA_DIR, or None if it is private, missing or escapes the directory"""
+    media_root = os.path.realpath(MEDIA_DIR)
+    full_path = os.path.realpath(os.path.join(media_root, media_path))
+    if os.path.commonpath([media_root, full_path]) != media_root:
+        return None
+    public_dir = os.path.relpath(full_path, media_root).split(os.sep)[0]
+    if public_dir not in MEDIA_PUBLIC_DIRS or not os.path.isfile(full_path):
+        return None
+    return full_path
+
+def get_storage_bucket():
+    global storage_bucket
+    if storage_bucket is None:
+        from google.cloud import storage
+        storage_bucket = storage.Client(project=FIRESTORE_PROJECT).bucket(MEDIA_BUCKET)
+    return storage_bucket
+
+async def save_upload_stream(upload: UploadFile, dest_path, max_bytes):
+    """Copy an upload to disk chunk by chunk; returns (bytes written, SHA-256 hex digest)"""
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with open(dest_path, "wb") as f:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail="File too large")
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    return size, digest.hexdigest()
+
+IMAGE_SAVE_OPTIONS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+def open_image(source_path):
+    """Open an image upright and in RGB/RGBA mode"""
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+        image.load()
+    return image
+
+def save_image_variant(image, width, dest_path, image_format):
+    """Resize (never upscaling) and encode one variant; returns (width, height)"""
+    from PIL import Image
+
+    original_width, original_height = image.size
+    width = min(width, original_width)
+    height = max(1, round(original_height * width / original_width))
+    resized = image if width == original_width else image.resize((width, height), Image.LANCZOS)
+
+    pil_format, _, options = IMAGE_SAVE_OPTIONS[image_format]
+    if pil_format == "JPEG" and resized.mode == "RGBA":
+        flattened = Image.new("RGB", resized.size, (255, 255, 255))
+        flattened.paste(resized, mask=resized.getchannel("A"))
+        resized = flattened
+    resized.save(dest_path, pil_format, **options)
+    return width, height
+
+def generate_image_variants(source_path, output_dir, base_name, widths):
+    """Resize an image to each width as WebP and JPEG (runs in the image process pool)"""
+    os.makedirs(output_dir, exist_ok=True)
+    image = open_image(source_path)
+    original_width = image.size[0]
+    targets = sorted({w for w in widths if w < original_width} | {min(original_width, max(widths))})
+
+    variants = []
+    for width in targets:
+        for image_format, (_, extension, _) in IMAGE_SAVE_OPTIONS.items():
+            filename = f"{base_name}-{width}.{extension}"
+            variant_width, variant_height = save_image_variant(image, width, os.path.join(output_dir, filename), image_format)
+            variants.append({
+                "file": filename,
+                "width": variant_width,
+                "height": variant_height,
+                "format": image_format,
+            })
+    return variants
+
+def publish_media_file(media_path, content_type):
+    """Make a file under MEDIA_DIR public and return its URL"""
+    if not MEDIA_BUCKET:
+        return f"/api/media/{media_path}"
+
+    local_path = os.path.join(MEDIA_DIR, media_path)
+    blob = get_storage_bucket().blob(media_path)
+    blob.cache_control = MEDIA_CACHE_CONTROL
+    blob.upload_from_filename(local_path, content_type=content_type)
+    os.remove(local_path)
+    base_url = MEDIA_BASE_URL or f"https://storage.googleapis.com/{MEDIA_BUCKET}"
+    return f"{base_url}/{media_path}"
+
+def publish_image_variants(variants):
+    published = []
+    for variant in variants:
+        url = publish_media_file(f"images/{variant['file']}", f"image/{variant['format']}")
+        published.append({
+            "url": url,
+            "width": variant["width"],
+            "height": variant["height"],
+            "format": variant["format"],
+        })
+    return published
+
+# Image proxy - allowed remote images are fetched once through a pooled HTTP
+# session, resized to a standard width and kept in a size-bounded on-disk LRU
+IMAGE_PROXY_ALLOWED_HOSTS = {
+    host.strip().lower()
+    for host in os.getenv(
+        "IMAGE_PROXY_ALLOWED_HOSTS",
+        "images.unsplash.com,i.ibb.co,i.ibb.co.com,c0.wallpaperflare.com,itbrief.com.au,customer-assets.emergentagent.com"
+    ).split(",")
+    if host.strip()
+}
+IMAGE_PROXY_MAX_REDIRECTS = 3
+IMAGE_PROXY_WIDTHS = [160, 320, 480, 640, 800, 1024, 1280, 1600, 1920]
+IMAGE_PROXY_CACHE_DIR = os.getenv("IMAGE_PROXY_CACHE_DIR", os.path.join(MEDIA_DIR, "proxy-cache"))
+IMAGE_PROXY_CACHE_BYTES = int(os.getenv("IMAGE_PROXY_CACHE_MB", "512")) * 1024 * 1024
+IMAGE_PROXY_MAX_SOURCE_BYTES = int(os.getenv("IMAGE_PROXY_MAX_SOURCE_MB", "25")) * 1024 * 1024
+IMAGE_PROXY_TIMEOUT = 15
+IMAGE_PROXY_CACHE_CONTROL = "public, max-age=2592000, stale-while-revalidate=86400"
+http_session = None
+image_proxy_cache = None  # cache filename -> size in bytes, least recently used first
+image_proxy_cache_bytes = 0
+image_proxy_inflight = {}  # cache filename -> Future, so concurrent misses share one fetch/render
+
+def get_http_session():
+    global http_session
+    if http_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=1)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = "SESGRG-ImageProxy/1.0"
+        http_session = session
+    return http_session
+
+def load_image_proxy_cache():
+    """Index the cache directory on first use, ordered by last access"""
+    global image_proxy_cache, image_proxy_cache_bytes
+    if image_proxy_cache is None:
+        os.makedirs(IMAGE_PROXY_CACHE_DIR, exist_ok=True)
+        entries = []
+        for entry in os.scandir(IMAGE_PROXY_CACHE_DIR):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        image_proxy_cache = OrderedDict((name, size) for _, name, size in sorted(entries))
+        image_proxy_cache_bytes = sum(image_proxy_cache.values())
+    return image_proxy_cache
+
+def image_proxy_cache_get(filename):
+    cache = load_image_proxy_cache()
+    if filename not in cache:
+        record_cache("image_proxy", False)
+        return None
+    path = os.path.join(IMAGE_PROXY_CACHE_DIR, filename)
+    try:
+        os.utime(path)  # keeps LRU order across restarts
+    except OSError:
+        image_proxy_cache_remove(filename)
+        record_cache("image_proxy", False)
+        return None
+    cache.move_to_end(filename)
+    record_cache("image_proxy", True)
+    return path
+
+def image_proxy_cache_remove(filename):
+    global image_proxy_cache_bytes
+    image_proxy_cache_bytes -= load_image_proxy_cache().pop(filename, 0)
+    try:
+        os.remove(os.path.join(IMAGE_PROXY_CACHE_DIR, filename))
+    except OSError:
+        pass
+
+def image_proxy_cache_put(filename, size):
+    global image_proxy_cache_bytes
+    cache = load_image_proxy_cache()
+    image_proxy_cache_bytes += size - cache.pop(filename, 0)
+    cache[filename] = size
+    while image_proxy_cache_bytes > IMAGE_PROXY_CACHE_BYTES and len(cache) > 1:
+        image_proxy_cache_remove(next(iter(cache)))
+
+def is_allowed_image_url(url):
+    parsed = urlparse(url)
+    return parsed.scheme in ("http", "https") and (parsed.hostname or "").lower() in IMAGE_PROXY_ALLOWED_HOSTS
+
+def open_remote_image(url):
+    """GET an allowed image URL, following redirects only to allowed hosts"""
+    for _ in range(IMAGE_PROXY_MAX_REDIRECTS + 1):
+        if not is_allowed_image_url(url):
+            raise ValueError("image host not allowed")
+        response = get_http_session().get(url, stream=True, timeout=IMAGE_PROXY_TIMEOUT, allow_redirects=False)
+        if not response.is_redirect:
+            return response
+        response.close()
+        url = urljoin(url, response.headers["location"])
+    raise ValueError("too many redirects")
+
+def fetch_remote_image(url, dest_path):
+    """Download a remote image to disk (runs in a worker thread); returns its size"""
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with open_remote_image(url) as response:
+            if response.status_code != 200:
+                raise ValueError(f"upstream returned {response.status_code}")
+            if not response.headers.get("content-type", "").startswith("image/"):
+                raise ValueError("upstream did not return an image")
+            size = 0
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(64 * 1024):
+                    size += len(chunk)
+                    if size > IMAGE_PROXY_MAX_SOURCE_BYTES:
+                        raise ValueError("upstream image too large")
+                    f.write(chunk)
+        os.replace(tmp_path, dest_path)
+        return size
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def render_proxy_image(source_path, dest_path, width, image_format):
+    """Resize a cached source image (runs in the image process pool); returns the output size"""
+    tmp_path = f"{dest_path}.tmp"
+    save_image_variant(open_image(source_path), width, tmp_path, image_format)
+    os.replace(tmp_path, dest_path)
+    return os.path.getsize(dest_path)
+
+async def get_or_create_cached_image(filename, create):
+    """Return the cached file's path, running create(path) -> size once on a miss"""
+    path = image_proxy_cache_get(filename)
+    if path is not None:
+        return path
+
+    pending = image_proxy_inflight.get(filename)
+    if pending is None:
+        async def create_and_index():
+            path = os.path.join(IMAGE_PROXY_CACHE_DIR, filename)
+            image_proxy_cache_put(filename, await create(path))
+            return path
+
+        pending = asyncio.ensure_future(create_and_index())
+        image_proxy_inflight[filename] = pending
+        pending.add_done_callback(lambda _: image_proxy_inflight.pop(filename, None))
+    return await asyncio.shield(pending)
+
+# Image placeholders - micro-thumbnail, intrinsic size and dominant colour are
+# computed by a background worker whenever a document's image changes and
+# stored on the document as image_meta
+IMAGE_FIELDS = {"photo_gallery": "url"}  # every other collection uses "image"
+PLACEHOLDER_COLLECTIONS = ["people", "projects", "news", "photo_gallery", "research_areas", "achievements", "events"]
+PLACEHOLDER_WIDTH = 16
+placeholder_queue = None
+placeholder_worker = None
+
+def get_image_field(collection_name):
+    return IMAGE_FIELDS.get(collection_name, "image")
+
+def compute_image_placeholder(source_path):
+    """Summarise an image for placeholders (runs in the image process pool)"""
+    from PIL import Image
+
+    image = open_image(source_path).convert("RGB")
+    width, height = image.size
+
+    thumbnail = image.resize((PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))), Image.LANCZOS)
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, "WEBP", quality=40)
+
+    palette = image.resize((64, 64)).quantize(colors=5)
+    _, index = max(palette.getcolors())
+    red, green, blue = palette.getpalette()[index * 3:index * 3 + 3]
+
+    return {
+        "width": width,
+        "height": height,
+        "dominant_color": f"#{red:02x}{green:02x}{blue:02x}",
+        "placeholder": "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode(),
+    }
+
+async def fetch_image_source(image_url):
+    """Local path for an image URL - uploads are read from MEDIA_DIR, allowed remote hosts via the proxy cache"""
+    if image_url.startswith("/api/media/"):
+        source_path = resolve_media_path(image_url[len("/api/media/"):])
+        if source_path is None:
+            raise ValueError(f"media file not found: {image_url}")
+        return source_path
+    if not is_allowed_image_url(image_url):
+        raise ValueError(f"image host not allowed: {image_url}")
+
+    loop = asyncio.get_running_loop()
+
+    async def fetch_source(path):
+        return await loop.run_in_executor(None, fetch_remote_image, image_url, path)
+
+    url_hash = hashlib.sha256(image_url.encode()).hexdigest()
+    return await get_or_create_cached_image(f"src-{url_hash}", fetch_source)
+
+async def run_placeholder_worker():
+    loop = asyncio.get_running_loop()
+    while True:
+        collection_name, doc_id, image_url = await placeholder_queue.get()
+        try:
+            image_meta = None
+            if image_url:
+                source_path = await fetch_image_source(image_url)
+                image_meta = await loop.run_in_executor(get_image_executor(), compute_image_placeholder, source_path)
+                image_meta["source"] = image_url
+
+            # Skip if the image changed (or the document went away) while we were working
+            current = await run_data_call_in_thread(get_document, collection_name, doc_id)
+            if current is not None and current.get(get_image_field(collection_name)) == image_url:
+                await run_data_call_in_thread(update_document, collection_name, doc_id, {"image_meta": image_meta})
+        except Exception as e:
+            logger.error("Error computing image placeholder: %s", e)
+        finally:
+            placeholder_queue.task_done()
+
+def enqueue_image_placeholder(collection_name, doc_id, image_url):
+    global placeholder_queue, placeholder_worker
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        if hook_loop.get() is not None:
+            hook_loop.get().call_soon_threadsafe(enqueue_image_placeholder, collection_name, doc_id, image_url)
+        return  # no event loop (e.g. a script) - use the backfill endpoint later
+
+    if placeholder_worker is None or placeholder_worker.done() or placeholder_worker.get_loop() is not loop:
+        placeholder_queue = asyncio.Queue()
+        placeholder_worker = loop.create_task(run_placeholder_worker())
+    placeholder_queue.put_nowait((collection_name, doc_id, image_url))
+
+def schedule_image_placeholder(collection_name, doc_id, doc):
+    """Queue placeholder work if the document's image differs from the one image_meta describes"""
+    if collection_name not in PLACEHOLDER_COLLECTIONS or doc_id is None or doc is None:
+        return
+    image_url = doc.get(get_image_field(collection_name))
+    image_meta = doc.get("image_meta")
+    if image_url and (image_meta or {}).get("source") != image_url:
+        enqueue_image_placeholder(collection_name, doc_id, image_url)
+    elif not image_url and image_meta:
+        enqueue_image_placeholder(collection_name, doc_id, None)
+
+write_hooks.append(schedule_image_placeholder)
+
+# Publication PDFs - resumable chunked uploads (each chunk carries Upload-Offset
+# and is streamed straight to the partial file), stored content-addressed under
+# pdfs/<sha256>.pdf and served with Range support and a strong ETag
+MAX_PDF_UPLOAD_BYTES = int(os.getenv("MAX_PDF_UPLOAD_MB", "100")) * 1024 * 1024
+PDF_CHUNK_SIZE = 5 * 1024 * 1024
+PDF_UPLOAD_DIR = os.path.join(MEDIA_DIR, "uploads")
+PDF_ACCEL_REDIRECT_PREFIX = os.getenv("PDF_ACCEL_REDIRECT_PREFIX")  # e.g. /protected-media/ behind nginx
+pdf_upload_locks = {}  # upload_id -> asyncio.Lock
+
+def sanitize_pdf_filename(filename):
+    """Display name for an uploaded PDF: no path, quotes, backslashes or control characters"""
+    name = os.path.basename((filename or "").replace("\\", "/"))
+    name = "".join(c for c in name if c not in '"\\' and unicodedata.category(c)[0] != "C")
+    stem = name[:-4] if name.lower().endswith(".pdf") else name
+    return (stem.strip(" .")[:150] or "document") + ".pdf"
+
+def content_disposition(disposition, filename):
+    """Header value with an ASCII filename fallback plus the RFC 5987 UTF-8 filename*"""
+    filename = sanitize_pdf_filename(filename)
+    stem = unicodedata.normalize("NFKD", filename[:-4]).encode("ascii", "ignore").decode()
+    ascii_stem = re.sub(r"[^A-Za-z0-9._ ()-]", "_", stem).strip(" ._") or "document"
+    return f"{disposition}; filename=\"{ascii_stem}.pdf\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+def get_pdf_upload_paths(upload_id):
+    if not upload_id.isalnum():
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return os.path.join(PDF_UPLOAD_DIR, f"{upload_id}.part"), os.path.join(PDF_UPLOAD_DIR, f"{upload_id}.json")
+
+def load_pdf_upload(upload_id):
+    """Return (session, current offset); the offset is the size of the partial file on disk"""
+    part_path, session_path = get_pdf_upload_paths(upload_id)
+    try:
+        with open(session_path) as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session, os.path.getsize(part_path)
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def finalize_pdf_upload(upload_id, session):
+    """Check, hash and publish a completed upload (runs in a worker thread)"""
+    part_path, session_path = get_pdf_upload_paths(upload_id)
+    with open(part_path, "rb") as f:
+        if f.read(5) != b"%PDF-":
+            raise ValueError("file is not a PDF")
+
+    sha256 = hash_file(part_path)
+    media_path = f"pdfs/{sha256}.pdf"
+    record = get_media_record(sha256)
+    if record is not None:
+        os.remove(part_path)
+    else:
+        os.makedirs(os.path.join(MEDIA_DIR, "pdfs"), exist_ok=True)
+        os.replace(part_path, os.path.join(MEDIA_DIR, media_path))
+        record = register_media(sha256, "pdf", [media_path], url=publish_media_file(media_path, "application/pdf"))
+    os.remove(session_path)
+    return {
+        "url": record["url"],
+        "path": media_path,
+        "sha256": sha256,
+        "size": session["size"],
+        "filename": session["filename"],
+        "uploaded_at": datetime.utcnow().isoformat(),
+    }
+
+# Content-addressed media store - stored files are named by the SHA-256 of the
+# uploaded bytes, so identical uploads are deduplicated and URLs never change.
+# Each record lists the documents referencing it; a periodic mark-and-sweep
+# deletes files that nothing has referenced for MEDIA_GC_GRACE_HOURS.
+MEDIA_GC_INTERVAL_SECONDS = int(os.getenv("MEDIA_GC_INTERVAL_SECONDS", str(6 * 3600)))
+MEDIA_GC_GRACE_HOURS = float(os.getenv("MEDIA_GC_GRACE_HOURS", "24"))
+MEDIA_INDEX_PATH = os.path.join(MEDIA_DIR, "media_index.json")
+MEDIA_HASH_PATTERN = re.compile(r"(?:images|pdfs)/([0-9a-f]{64})")
+MEDIA_REFERENCING_COLLECTIONS = [
+    "people", "publications", "projects", "achievements", "news", "events", "photo_gallery", "research_areas"
+]
+media_records = None  # local index (sha256 -> record) used when Firestore is unavailable
+media_doc_refs = None  # "collection/doc_id" -> set of sha256, inverted from the records
+media_lock = threading.Lock()
+
+def load_local_media_records():
+    global media_records
+    if media_records is None:
+        try:
+            with open(MEDIA_INDEX_PATH) as f:
+                media_records = json.load(f)
+        except (OSError, ValueError):
+            media_records = {}
+    return media_records
+
+def get_media_record(sha256):
+    db = get_db()
+    if db is None:
+        with media_lock:
+            return load_local_media_records().get(sha256)
+    with track_data_call("media", "get", docs=1, shape="media/{sha256}"):
+        doc = db.collection("media").document(sha256).get()
+    return doc.to_dict() if doc.exists else None
+
+def save_media_record(sha256, record):
+    db = get_db()
+    if db is None:
+        with media_lock:
+            load_local_media_records()[sha256] = record
+            write_json_atomic(MEDIA_INDEX_PATH, media_records)
+        return
+    with track_data_call("media", "set", docs=1, shape="media/{sha256}"):
+        db.collection("media").document(sha256).set(record)
+
+def delete_media_record(sha256):
+    db = get_db()
+    if db is None:
+        with media_lock:
+            load_local_media_records().pop(sha256, None)
+            write_json_atomic(MEDIA_INDEX_PATH, media_records)
+        return
+    with track_data_call("media", "delete", docs=1, shape="media/{sha256}"):
+        db.collection("media").document(sha256).delete()
+
+def list_media_records():
+    db = get_db()
+    if db is None:
+        with media_lock:
+            return dict(load_local_media_records())
+    with track_data_call("media", "query", shape="media") as call:
+        records = {doc.id: doc.to_dict() for doc in db.collection("media").stream()}
+        call["docs"] = len(records)
+    return records
+
+def register_media(sha256, kind, files, **details):
+    record = {"kind": kind, "files": files, "refs": [], "created_at": datetime.utcnow().isoformat(), **details}
+    save_media_record(sha256, record)
+    return record
+
+def find_media_hashes(value):
+    """All media hashes referenced anywhere in a document"""
+    if isinstance(value, str):
+        return set(MEDIA_HASH_PATTERN.findall(value))
+    if isinstance(value, dict):
+        value = value.values()
+    if isinstance(value, (list, tuple, type({}.values()))):
+        return set().union(*(find_media_hashes(item) for item in value))
+    return set()
+
+def get_media_doc_refs():
+    global media_doc_refs
+    if media_doc_refs is None:
+        doc_refs = {}
+        for sha256, record in list_media_records().items():
+            for doc_key in record.get("refs", []):
+                doc_refs.setdefault(doc_key, set()).add(sha256)
+        media_doc_refs = doc_refs
+    return media_doc_refs
+
+def update_media_refs(collection_name, doc_id, doc):
+    """Point media records at the hashes a document references now (doc is None after a delete)"""
+    if collection_name not in MEDIA_REFERENCING_COLLECTIONS or doc_id is None:
+        return
+    doc_key = f"{collection_name}/{doc_id}"
+    new_hashes = find_media_hashes(doc) if doc is not None else set()
+    doc_refs = get_media_doc_refs()
+    old_hashes = doc_refs.get(doc_key, set())
+    if new_hashes == old_hashes:
+        return
+
+    for sha256 in new_hashes ^ old_hashes:
+        record = get_media_record(sha256)
+        if record is None:
+            continue
+        refs = set(record.get("refs", []))
+        if sha256 in new_hashes:
+            refs.add(doc_key)
+        else:
+            refs.discard(doc_key)
+        record["refs"] = sorted(refs)
+        record["unreferenced_since"] = None if refs else datetime.utcnow().isoformat()
+        save_media_record(sha256, record)
+
+    if new_hashes:
+        doc_refs[doc_key] = new_hashes
+    else:
+        doc_refs.pop(doc_key, None)
+
+write_hooks.append(update_media_refs)
+
+def delete_media_files(sha256, record):
+    for media_path in record.get("files", []) + [f"originals/{sha256}"]:
+        try:
+            if MEDIA_BUCKET and not media_path.startswith("originals/"):
+                get_storage_bucket().blob(media_path).delete()
+            else:
+                os.remove(os.path.join(MEDIA_DIR, media_path))
+        except Exception:
+            pass  # already gone
+
+def sweep_media(grace_hours=None):
+    """Mark-and-sweep over every document; deletes media unreferenced for longer than the grace period"""
+    global media_doc_refs
+    grace = timedelta(hours=MEDIA_GC_GRACE_HOURS if grace_hours is None else grace_hours)
+    now = datetime.utcnow()
+
+    # Read documents directly so a Firestore error aborts the sweep instead of
+    # falling back to mock data and making everything look unreferenced
+    db = get_db()
+    referenced = {}
+    for collection_name in MEDIA_REFERENCING_COLLECTIONS:
+        if db is None:
+            docs = [(doc.get("id"), doc) for doc in in_memory_db.get(collection_name, [])]
+        else:
+            with track_data_call(collection_name, "query", shape=f"{collection_name} (media GC scan)") as call:
+                docs = [(doc.id, doc.to_dict()) for doc in db.collection(collection_name).stream()]
+                call["docs"] = len(docs)
+        for doc_id, doc in docs:
+            for sha256 in find_media_hashes(doc):
+                referenced.setdefault(sha256, set()).add(f"{collection_name}/{doc_id}")
+
+    deleted, repaired = [], 0
+    for sha256, record in list_media_records().items():
+        refs = referenced.get(sha256, set())
+        if set(record.get("refs", [])) != refs:
+            record["refs"] = sorted(refs)
+            record["unreferenced_since"] = None if refs else now.isoformat()
+            save_media_record(sha256, record)
+            repaired += 1
+        if refs:
+            continue
+
+        since = record.get("unreferenced_since") or record.get("created_at")
+        if since and datetime.fromisoformat(since) > now - grace:
+            continue
+        delete_media_files(sha256, record)
+        delete_media_record(sha256)
+        deleted.append(sha256)
+
+    media_doc_refs = None  # rebuilt from the records on next use
+    return {"deleted": deleted, "repaired": repaired, "referenced": len(referenced)}
+
+async def run_media_gc_loop():
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(MEDIA_GC_INTERVAL_SECONDS)
+        try:
+            result = await loop.run_in_executor(None, sweep_media)
+            if result["deleted"]:
+                logger.info("Media GC deleted %d unreferenced files", len(result["deleted"]))
+        except Exception as e:
+            logger.error("Error running media GC: %s", e)
+
+# Search - in-process BM25 index over every content collection, built from the
+# collections on first use and kept current by a write hook
+SEARCH_FIELDS = {
+    "people": {"name": 3.0, "title": 1.5, "department": 1.0, "bio": 1.0, "research_interests": 2.0},
+    "publications": {
+        "title": 3.0, "authors": 2.0, "keywords": 2.0, "research_areas": 1.5,
+        "journal_name": 1.0, "conference_name": 1.0, "book_title": 1.0
+    },
+    "projects": {
+        "name": 3.0, "description": 1.0, "team_leader": 2.0, "team_members": 1.5,
+        "research_area": 1.5, "funded_by": 1.0
+    },
+    "news": {"title": 3.0, "excerpt": 1.5, "content": 1.0, "tags": 2.0, "author": 1.5},
+    "events": {"title": 3.0, "description": 1.0, "location": 1.0, "event_type": 1.0},
+    "achievements": {"title": 3.0, "description": 1.0, "category": 1.0},
+    "research_areas": {"title": 3.0, "description": 1.5, "details": 1.0},
+}
+SEARCH_TITLE_FIELDS = {"people": "name", "projects": "name"}  # every other collection uses "title"
+SEARCH_HTML_FIELDS = [("news", "content")]
+SEARCH_STOPWORDS = frozenset("a an and are as at be by for from in into is it of on or the to with".split())
+TOKEN_PATTERN = re.compile(r"\w+")
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+search_index = None
+search_docs = {}  # (collection, doc_id) -> {"title": ..., "fields": {field: text}}
+search_index_lock = threading.Lock()
+
+def strip_html(text):
+    return html.unescape(HTML_TAG_PATTERN.sub(" ", text))
+
+def normalize_text(text):
+    """Lowercase and strip accents so "Rahmán" matches "rahman" """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(normalize_text(text)) if token not in SEARCH_STOPWORDS]
+
+def field_text(value):
+    """Flatten a field value (string, list, number) into plain text"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(field_text(item) for item in value)
+    return str(value)
+
+def get_search_fields(collection_name, doc):
+    fields = {}
+    for field in SEARCH_FIELDS[collection_name]:
+        text = field_text(doc.get(field))
+        if (collection_name, field) in SEARCH_HTML_FIELDS:
+            text = strip_html(text)
+        if text.strip():
+            fields[field] = " ".join(text.split())
+    return fields
+
+class BM25Index:
+    """Field-weighted BM25 over (collection, doc_id) keys with incremental add/remove"""
+
+    def __init__(self, field_weights, k1=1.2, b=0.75):
+        self.field_weights = field_weights
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> {key: weighted term frequency}
+        self.doc_terms = {}  # key -> {term: weighted term frequency}
+        self.doc_lengths = {}
+        self.total_length = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, key, fields):
+        weights = self.field_weights[key[0]]
+        terms = {}
+        for field, text in fields.items():
+            for token in tokenize(text):
+                terms[token] = terms.get(token, 0.0) + weights.get(field, 1.0)
+        with self.lock:
+            self._remove(key)
+            self.doc_terms[key] = terms
+            self.doc_lengths[key] = sum(terms.values())
+            self.total_length += self.doc_lengths[key]
+            for term, tf in terms.items():
+                self.postings.setdefault(term, {})[key] = tf
+
+    def remove(self, key):
+        with self.lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        terms = self.doc_terms.pop(key, None)
+        if terms is None:
+            return
+        self.total_length -= self.doc_lengths.pop(key)
+        for term in terms:
+            posting = self.postings[term]
+            del posting[key]
+            if not posting:
+                del self.postings[term]
+
+    def search(self, query_terms, collections=None, limit=20):
+        """Top (score, key) pairs, optionally restricted to some collections"""
+        with self.lock:
+            doc_count = len(self.doc_lengths)
+            if doc_count == 0:
+                return []
+            avg_length = self.total_length / doc_count
+            scores = {}
+            for term in set(query_terms):
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for key, tf in posting.items():
+                    if collections is not None and key[0] not in collections:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[key] / avg_length)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(limit, ((score, key) for key, score in scores.items()))
+
+def index_search_document(index, collection_name, doc_id, doc):
+    key = (collection_name, doc_id)
+    fields = get_search_fields(collection_name, doc)
+    search_docs[key] = {"title": doc.get(SEARCH_TITLE_FIELDS.get(collection_name, "title"), ""), "fields": fields}
+    index.add(key, fields)
+
+def get_search_index():
+    global search_index
+    if search_index is None:
+        with search_index_lock:
+            if search_index is None:
+                index = BM25Index(SEARCH_FIELDS)
+                for collection_name in SEARCH_FIELDS:
+                    for doc in get_collection_data(collection_name):
+                        index_search_document(index, collection_name, doc["id"], doc)
+                search_index = index
+    return search_index
+
+def search_write_hook(collection_name, doc_id, doc):
+    if search_index is None or collection_name not in SEARCH_FIELDS or doc_id is None:
+        return  # not built yet - the first search reads everything
+    if doc is None:
+        search_index.remove((collection_name, doc_id))
+        search_docs.pop((collection_name, doc_id), None)
+    else:
+        index_search_document(search_index, collection_name, doc_id, doc)
+
+write_hooks.append(search_write_hook)
+
+def highlight_text(text, query_terms, width=160):
+    """Snippet around the first query match, HTML-escaped with <mark> around matches"""
+    normalized = normalize_text(text)
+    if len(normalized) != len(text):
+        normalized = text.lower()  # offsets must line up with the original text
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in query_terms) + r")\w*")
+    first = pattern.search(normalized)
+    if first is None:
+        return None
+
+    start = max(0, first.start() - width // 3)
+    end = min(len(text), start + width)
+    parts, position = [], start
+    for match in pattern.finditer(normalized, start, end):
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append("<mark>" + html.escape(text[match.start():match.end()]) + "</mark>")
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(text) else "")
+
+# Term sources shared by the fuzzy and autocomplete indexes. Fuzzy matching is
+# a character-trigram index over author names, keywords and people names so
+# "Rahman" finds "Rahmann" and transliteration variants. Entries are keyed by a folded form; postings are compact arrays of entry IDs.
+TERM_SOURCES = {
+    "publications": [("authors", "author"), ("keywords", "keyword"), ("research_areas", "research_area")],
+    "projects": [("research_area", "research_area")],
+    "news": [("tags", "tag")],
+    "people": [("name", "person")],
+}
+FUZZY_KINDS = ["author", "keyword", "person"]
+FUZZY_THRESHOLD = 0.3
+NAME_HONORIFICS = frozenset("dr prof professor md mr mrs ms miss eng engr sir".split())
+FOLD_REPLACEMENTS = [("ph", "f"), ("bh", "b"), ("dh", "d"), ("gh", "g"), ("kh", "k"), ("th", "t"), ("ee", "i"), ("oo", "u"), ("ou", "u")]
+DOUBLED_LETTER_PATTERN = re.compile(r"(\w)\1+")
+trigram_index = None
+trigram_doc_terms = {}  # (collection, doc_id) -> [(kind, value), ...]
+trigram_index_lock = threading.Lock()
+
+def get_document_terms(collection_name, doc, kinds=None):
+    """(kind, value) pairs a document contributes to the term indexes"""
+    terms = []
+    for field, kind in TERM_SOURCES.get(collection_name, []):
+        if kinds is not None and kind not in kinds:
+            continue
+        value = doc.get(field)
+        values = value if isinstance(value, list) else [value]
+        terms.extend((kind, v.strip()) for v in values if isinstance(v, str) and v.strip())
+    return terms
+
+def fold_term(value):
+    """Spelling-insensitive key: accents, punctuation, honorifics and common transliteration variants removed"""
+    words = tokenize(value)
+    if len(words) > 1:
+        words = [w for w in words if w not in NAME_HONORIFICS] or words
+    folded = " ".join(words)
+    for old, new in FOLD_REPLACEMENTS:
+        folded = folded.replace(old, new)
+    return DOUBLED_LETTER_PATTERN.sub(r"\1", folded)
+
+def get_trigrams(folded):
+    """Trigrams of each word padded like pg_trgm ("  ra", " rah", ... "an ")"""
+    trigrams = set()
+    for word in folded.split():
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+class TrigramIndex:
+    """Fuzzy string lookup by trigram overlap with array-backed postings"""
+
+    def __init__(self):
+        self.entry_ids = {}  # (kind, folded) -> entry id
+        self.entries = []  # entry id -> [kind, display value, reference count]
+        self.trigram_counts = array("H")  # entry id -> number of distinct trigrams
+        self.postings = {}  # trigram -> array("I") of entry ids
+        self.dead_entries = 0
+        self.lock = threading.Lock()
+
+    def add(self, kind, value):
+        folded = fold_term(value)
+        if not folded:
+            return
+        with self.lock:
+            entry_id = self.entry_ids.get((kind, folded))
+            if entry_id is not None:
+                entry = self.entries[entry_id]
+                if entry[2] == 0:
+                    self.dead_entries -= 1
+                    entry[1] = value
+                entry[2] += 1
+                return
+            entry_id = len(self.entries)
+            trigrams = get_trigrams(folded)
+            self.entry_ids[(kind, folded)] = entry_id
+            self.entries.append([kind, value, 1])
+            self.trigram_counts.append(min(len(trigrams), 65535))
+            for trigram in trigrams:
+                posting = self.postings.get(trigram)
+                if posting is None:
+                    posting = self.postings[trigram] = array("I")
+                posting.append(entry_id)
+
+    def discard(self, kind, value):
+        with self.lock:
+            entry_id = self.entry_ids.get((kind, fold_term(value)))
+            if entry_id is None or self.entries[entry_id][2] == 0:
+                return
+            self.entries[entry_id][2] -= 1
+            if self.entries[entry_id][2] == 0:
+                self.dead_entries += 1
+                if self.dead_entries > 1000 and self.dead_entries * 4 > len(self.entries):
+                    self._compact()
+
+    def _compact(self):
+        """Rebuild without dead entries so postings don't grow forever (caller holds self.lock)"""
+        entry_ids, entries, trigram_counts, postings = {}, [], array("H"), {}
+        for kind, value, count in self.entries:
+            if count == 0:
+                continue
+            folded = fold_term(value)
+            entry_id = len(entries)
+            trigrams = get_trigrams(folded)
+            entry_ids[(kind, folded)] = entry_id
+            entries.append([kind, value, count])
+            trigram_counts.append(min(len(trigrams), 65535))
+            for trigram in trigrams:
+                postings.setdefault(trigram, array("I")).append(entry_id)
+        # Swap the new structures in; the lock itself is kept
+        self.entry_ids, self.entries, self.trigram_counts, self.postings = entry_ids, entries, trigram_counts, postings
+        self.dead_entries = 0
+
+    def search(self, query, kinds=None, limit=10, threshold=FUZZY_THRESHOLD):
+        """Best matches as dicts with a 0..1 score (mean of trigram similarity and word similarity)"""
+        query_trigrams = get_trigrams(fold_term(query))
+        if not query_trigrams:
+            return []
+        with self.lock:
+            shared = {}
+            for trigram in query_trigrams:
+                for entry_id in self.postings.get(trigram, ()):
+                    shared[entry_id] = shared.get(entry_id, 0) + 1
+
+            matches = []
+            for entry_id, overlap in shared.items():
+                kind, value, count = self.entries[entry_id]
+                if count == 0 or (kinds is not None and kind not in kinds):
+                    continue
+                similarity = overlap / (len(query_trigrams) + self.trigram_counts[entry_id] - overlap)
+                word_similarity = overlap / len(query_trigrams)
+                score = (similarity + word_similarity) / 2
+                if score >= threshold:
+                    matches.append((score, count, value, kind))
+        matches = heapq.nlargest(limit, matches)
+        return [{"value": value, "kind": kind, "score": round(score, 4), "count": count} for score, count, value, kind in matches]
+
+def get_trigram_index():
+    global trigram_index
+    if trigram_index is None:
+        with trigram_index_lock:
+            if trigram_index is None:
+                index = TrigramIndex()
+                for collection_name in TERM_SOURCES:
+                    for doc in get_collection_data(collection_name):
+                        trigram_write_hook(collection_name, doc["id"], doc, index)
+                trigram_index = index
+    return trigram_index
+
+def trigram_write_hook(collection_name, doc_id, doc, index=None):
+    index = index or trigram_index
+    if index is None or collection_name not in TERM_SOURCES or doc_id is None:
+        return
+    key = (collection_name, doc_id)
+    for kind, value in trigram_doc_terms.pop(key, []):
+        index.discard(kind, value)
+    if doc is not None:
+        terms = get_document_terms(collection_name, doc, FUZZY_KINDS)
+        for kind, value in terms:
+            index.add(kind, value)
+        trigram_doc_terms[key] = terms
+
+write_hooks.append(trigram_write_hook)
+
+# Autocomplete - sorted (key, entry) array searched with bisect. Every word
+# start of a term is a key so "rah" suggests "Muhammad Rahman"; ties between
+# prefix matches are broken by how many documents use the term.
+AUTOCOMPLETE_KINDS = ["author", "keyword", "research_area", "tag", "person"]
+AUTOCOMPLETE_SCAN_LIMIT = 500
+AUTOCOMPLETE_CACHE_SIZE = 1024
+autocomplete_index = None
+autocomplete_doc_terms = {}  # (collection, doc_id) -> [(kind, value), ...]
+autocomplete_index_lock = threading.Lock()
+
+class PrefixIndex:
+    """Frequency-weighted prefix lookup over a sorted key array"""
+
+    def __init__(self):
+        self.keys = []  # sorted (word-start key, (kind, normalized term))
+        self.entries = {}  # (kind, normalized term) -> [display value, reference count]
+        self.results = OrderedDict()  # (prefix, kinds, limit) -> suggestions, cleared on writes
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def term_keys(normalized):
+        words = normalized.split()
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def add(self, kind, value):
+        normalized = " ".join(TOKEN_PATTERN.findall(normalize_text(value)))
+        if not normalized:
+            return
+        entry_key = (kind, normalized)
+        with self.lock:
+            self.results.clear()
+            entry = self.entries.get(entry_key)
+            if entry is not None:
+                entry[1] += 1
+                return
+            self.entries[entry_key] = [value, 1]
+            for key in self.term_keys(normalized):
+                bisect.insort(self.keys, (key, entry_key))
+
+    def discard(self, kind, value):
+        normalized = " ".join(TOKEN_PATTERN.findall(normalize_text(value)))
+        entry_key = (kind, normalized)
+        with self.lock:
+            entry = self.entries.get(entry_key)
+            if entry is None:
+                return
+            self.results.clear()
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self.entries[entry_key]
+            for key in self.term_keys(normalized):
+                position = bisect.bisect_left(self.keys, (key, entry_key))
+                if position < len(self.keys) and self.keys[position] == (key, entry_key):
+                    del self.keys[position]
+
+    def suggest(self, prefix, kinds=None, limit=10):
+        prefix = " ".join(TOKEN_PATTERN.findall(normalize_text(prefix)))
+        if not prefix:
+            return []
+        cache_key = (prefix, None if kinds is None else tuple(sorted(kinds)), limit)
+        with self.lock:
+            cached = self.results.get(cache_key)
+            record_cache("autocomplete", cached is not None)
+            if cached is not None:
+                self.results.move_to_end(cache_key)
+                return cached
+            start = bisect.bisect_left(self.keys, (prefix,))
+            end = min(bisect.bisect_left(self.keys, (prefix + "\uffff",)), start + AUTOCOMPLETE_SCAN_LIMIT)
+            candidates = {}
+            for key, entry_key in self.keys[start:end]:
+                if kinds is not None and entry_key[0] not in kinds:
+                    continue
+                # Whole-term prefix matches rank above matches on a later word
+                candidates[entry_key] = max(candidates.get(entry_key, 0), 1 if key == entry_key[1] else 0)
+            ranked = heapq.nlargest(
+                limit, candidates.items(),
+                key=lambda item: (item[1], self.entries[item[0]][1], -len(item[0][1]))
+            )
+            suggestions = [
+                {"value": self.entries[entry_key][0], "kind": entry_key[0], "count": self.entries[entry_key][1]}
+                for entry_key, _ in ranked
+            ]
+            self.results[cache_key] = suggestions
+            if len(self.results) > AUTOCOMPLETE_CACHE_SIZE:
+                self.results.popitem(last=False)
+            return suggestions
+
+def get_autocomplete_index():
+    global autocomplete_index
+    if autocomplete_index is None:
+        with autocomplete_index_lock:
+            if autocomplete_index is None:
+                index = PrefixIndex()
+                for collection_name in TERM_SOURCES:
+                    for doc in get_collection_data(collection_name):
+                        autocomplete_write_hook(collection_name, doc["id"], doc, index)
+                autocomplete_index = index
+    return autocomplete_index
+
+def autocomplete_write_hook(collection_name, doc_id, doc, index=None):
+    index = index or autocomplete_index
+    if index is None or collection_name not in TERM_SOURCES or doc_id is None:
+        return
+    key = (collection_name, doc_id)
+    for kind, value in autocomplete_doc_terms.pop(key, []):
+        index.discard(kind, value)
+    if doc is not None:
+        terms = get_document_terms(collection_name, doc, AUTOCOMPLETE_KINDS)
+        for kind, value in terms:
+            index.add(kind, value)
+        autocomplete_doc_terms[key] = terms
+
+write_hooks.append(autocomplete_write_hook)
+
+# Author linkage - resolves publication authors and project team strings to
+# people documents. Names match on their folded form (see fold_term) or on
+# initials + surname when that is unambiguous; person "author_aliases" and the
+# settings "author_links" map ({author string: person id, or null to unlink})
+# are manual overrides. Rebuilt when people or settings change, otherwise
+# maintained per document.
+LINKED_COLLECTIONS = {
+    "publications": ["authors"],
+    "projects": ["team_leader", "team_members"],
+}
+author_link_index = None
+author_link_lock = threading.Lock()
+
+def get_site_settings():
+    db = get_db()
+    if db is None:
+        return in_memory_db["settings"]
+    with track_data_call("settings", "get", docs=1, shape="settings/site_config"):
+        doc = db.collection("settings").document("site_config").get()
+    return doc.to_dict() if doc.exists else in_memory_db["settings"]
+
+def get_linked_names(collection_name, doc):
+    """Person name strings referenced by a publication or project"""
+    names = []
+    for field in LINKED_COLLECTIONS.get(collection_name, []):
+        value = doc.get(field)
+        values = value if isinstance(value, list) else (value or "").split(",")
+        names.extend(v.strip() for v in values if isinstance(v, str) and v.strip())
+    return names
+
+def initials_key(folded):
+    words = folded.split()
+    if len(words) < 2:
+        return None
+    return " ".join([w[0] for w in words[:-1]] + [words[-1]])
+
+class AuthorLinkIndex:
+    """Author string -> person ID resolution plus person ID -> document ID postings"""
+
+    def __init__(self, people, overrides):
+        self.names = {}  # folded name -> person id
+        self.initials = {}  # initials key -> person id, or None when ambiguous
+        self.overrides = {fold_term(name): person_id for name, person_id in (overrides or {}).items()}
+        for person in people:
+            for name in [person.get("name")] + list(person.get("author_aliases") or []):
+                if not isinstance(name, str) or not fold_term(name):
+                    continue
+                folded = fold_term(name)
+                self.names.setdefault(folded, person["id"])
+                key = initials_key(folded)
+                if key:
+                    self.initials[key] = person["id"] if self.initials.get(key, person["id"]) == person["id"] else None
+        self.doc_links = {}  # (collection, doc id) -> set of person ids
+        self.by_person = {collection_name: {} for collection_name in LINKED_COLLECTIONS}
+
+    def resolve(self, name):
+        folded = fold_term(name)
+        if folded in self.overrides:
+            return self.overrides[folded]
+        if folded in self.names:
+            return self.names[folded]
+        # Only abbreviated given names ("M. Rahman", "M Rahman") fall back to initials;
+        # a different full name ("Mizanur Rahman" vs "Mohammad Rahman") stays unlinked
+        words = folded.split()
+        if len(words) < 2 or any(len(word) > 1 for word in words[:-1]):
+            return None
+        return self.initials.get(initials_key(folded))
+
+    def update(self, collection_name, doc_id, doc):
+        postings = self.by_person[collection_name]
+        for person_id in self.doc_links.pop((collection_name, doc_id), ()):
+            postings[person_id].discard(doc_id)
+        if doc is None:
+            return
+        person_ids = {self.resolve(name) for name in get_linked_names(collection_name, doc)}
+        person_ids.discard(None)
+        for person_id in person_ids:
+            postings.setdefault(person_id, set()).add(doc_id)
+        self.doc_links[(collection_name, doc_id)] = person_ids
+
+    def get_doc_ids(self, collection_name, person_id):
+        return sorted(self.by_person[collection_name].get(person_id, ()))
+
+def get_author_link_index():
+    global author_link_index
+    index = author_link_index
+    if index is None:
+        with author_link_lock:
+            index = author_link_index
+            if index is None:
+                overrides = get_site_settings().get("author_links")
+                index = AuthorLinkIndex(get_collection_data("people"), overrides)
+                for collection_name in LINKED_COLLECTIONS:
+                    for doc in get_collection_data(collection_name):
+                        index.update(collection_name, doc["id"], doc)
+                author_link_index = index
+    return index
+
+def author_link_write_hook(collection_name, doc_id, doc):
+    global author_link_index
+    if collection_name in ("people", "settings"):
+        # Name resolution changed - rebuild on next lookup
+        author_link_index = None
+    elif author_link_index is not None and collection_name in LINKED_COLLECTIONS and doc_id is not None:
+        with author_link_lock:
+            author_link_index.update(collection_name, doc_id, doc)
+
+write_hooks.append(author_link_write_hook)
+
+# Research area links - reverse index from research area ID to the related
+# publications, projects, people and news. Content refers to areas by title (or
+# slug) in the fields below; values are matched on their folded, singular form
+# ("Smart Grid Technology" -> smart-grid-technologies). Rebuilt when research
+# areas change, otherwise maintained per document.
+AREA_LINK_FIELDS = {
+    "publications": ["research_areas"],
+    "projects": ["research_area"],
+    "people": ["research_interests"],
+    "news": ["tags"],
+}
+AREA_COUNT_COLLECTIONS = ["publications", "projects"]
+AREA_RECONCILE_INTERVAL_SECONDS = int(os.getenv("AREA_RECONCILE_INTERVAL_SECONDS", "3600"))
+research_area_index = None
+research_area_lock = threading.Lock()
+research_area_pending_writes = None  # writes seen while reconcile rebuilds, replayed before the swap
+
+def area_key(value):
+    words = []
+    for word in fold_term(value).split():
+        if word.endswith("ies") and len(word) > 4:
+            word = word[:-3] + "y"
+        elif word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+class ResearchAreaIndex:
+    """Area ID -> related document IDs per collection"""
+
+    def __init__(self, areas):
+        self.area_keys = {}  # folded title or id -> area id
+        for area in areas:
+            for value in (area.get("id"), area.get("title")):
+                if isinstance(value, str) and area_key(value):
+                    self.area_keys.setdefault(area_key(value), area["id"])
+        self.doc_links = {}  # (collection, doc id) -> set of area ids
+        self.by_area = {collection_name: {} for collection_name in AREA_LINK_FIELDS}
+
+    def get_area_ids(self, collection_name, doc):
+        area_ids = set()
+        for field in AREA_LINK_FIELDS[collection_name]:
+            value = doc.get(field)
+            values = value if isinstance(value, list) else [value]
+            for v in values:
+                if isinstance(v, str) and area_key(v) in self.area_keys:
+                    area_ids.add(self.area_keys[area_key(v)])
+        return area_ids
+
+    def update(self, collection_name, doc_id, doc):
+        postings = self.by_area[collection_name]
+        for area_id in self.doc_links.pop((collection_name, doc_id), ()):
+            postings[area_id].discard(doc_id)
+        if doc is None:
+            return
+        area_ids = self.get_area_ids(collection_name, doc)
+        for area_id in area_ids:
+            postings.setdefault(area_id, set()).add(doc_id)
+        self.doc_links[(collection_name, doc_id)] = area_ids
+
+    def get_doc_ids(self, collection_name, area_id):
+        return sorted(self.by_area[collection_name].get(area_id, ()))
+
+    def get_counts(self, area_id):
+        return {
+            collection_name: len(self.by_area[collection_name].get(area_id, ()))
+            for collection_name in AREA_COUNT_COLLECTIONS
+        }
+
+def build_research_area_index():
+    index = ResearchAreaIndex(get_collection_data("research_areas"))
+    for collection_name in AREA_LINK_FIELDS:
+        for doc in get_collection_data(collection_name):
+            index.update(collection_name, doc["id"], doc)
+    return index
+
+def get_research_area_index():
+    global research_area_index
+    index = research_area_index
+    if index is None:
+        with research_area_lock:
+            index = research_area_index
+            if index is None:
+                index = research_area_index = build_research_area_index()
+    return index
+
+def research_area_write_hook(collection_name, doc_id, doc):
+    global research_area_index
+    if collection_name != "research_areas" and (collection_name not in AREA_LINK_FIELDS or doc_id is None):
+        return
+    with research_area_lock:
+        if research_area_pending_writes is not None:
+            research_area_pending_writes.append((collection_name, doc_id, doc))
+        if collection_name == "research_areas":
+            research_area_index = None
+        elif research_area_index is not None:
+            research_area_index.update(collection_name, doc_id, doc)
+
+write_hooks.append(research_area_write_hook)
+
+def reconcile_research_area_index():
+    """Rebuild the area index from the collections and report counts that had drifted"""
+    global research_area_index, research_area_pending_writes
+    with research_area_lock:
+        research_area_pending_writes = []
+    try:
+        fresh = build_research_area_index()
+    finally:
+        with research_area_lock:
+            pending, research_area_pending_writes = research_area_pending_writes, None
+    drifted = {}
+    with research_area_lock:
+        # The rebuild may have read a collection before a concurrent write landed;
+        # updates are idempotent, so replaying every write seen meanwhile is safe
+        if any(collection_name == "research_areas" for collection_name, _, _ in pending):
+            research_area_index = None  # area titles changed mid-rebuild; rebuilt on next use
+            return drifted
+        for collection_name, doc_id, doc in pending:
+            fresh.update(collection_name, doc_id, doc)
+        current = research_area_index
+        if current is not None:
+            for area_id in set(fresh.area_keys.values()):
+                if current.get_counts(area_id) != fresh.get_counts(area_id):
+                    drifted[area_id] = {"was": current.get_counts(area_id), "now": fresh.get_counts(area_id)}
+        research_area_index = fresh
+    return drifted
+
+async def run_area_reconcile_loop():
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(AREA_RECONCILE_INTERVAL_SECONDS)
+        try:
+            drifted = await loop.run_in_executor(None, reconcile_research_area_index)
+            if drifted:
+                logger.warning("Research area counts corrected for %d areas", len(drifted), extra={"fields": {"drifted": drifted}})
+                if SNAPSHOT_MODE:
+                    schedule_snapshot_regeneration("research_areas")
+        except Exception as e:
+            logger.error("Error reconciling research area counts: %s", e)
+
 # Pydantic Models
 class TokenResponse(BaseModel):
     access_token: str
@@ -358,6 +2784,15 @@ class LoginRequest(BaseModel):
     username: str
     password: str
 
+class UserCreate(BaseModel):
+    username: str
+    password: str
+    role: str = "admin"
+
+class PdfUploadCreate(BaseModel):
+    filename: str
+    size: int
+
 class PersonCreate(BaseModel):
     name: str
     title: str
@@ -369,6 +2804,7 @@ class PersonCreate(BaseModel):
     email: Optional[str] = None
     social_links: Dict[str, str] = {}
     display_order: Optional[int] = None
+    author_aliases: List[str] = []  # Other spellings used in publication author lists
 
 class PublicationCreate(BaseModel):
     title: str
@@ -440,11 +2876,107 @@ class EventCreate(BaseModel):
     registration_link: Optional[str] = None
 
 # Authentication Functions
+def get_pwd_context():
+    global pwd_context
+    if pwd_context is None:
+        from passlib.context import CryptContext
+        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return pwd_context
+
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+def get_default_users():
+    """Seed the in-memory user store with the env-configured admin account"""
+    if not in_memory_users:
+        admin_username = os.getenv("ADMIN_USERNAME", "admin")
+        password_hash = os.getenv("ADMIN_PASSWORD_HASH") or get_password_hash(os.getenv("ADMIN_PASSWORD", "@dminsesg705"))
+        in_memory_users[admin_username] = {
+            "username": admin_username,
+            "password_hash": password_hash,
+            "role": "admin"
+        }
+    return in_memory_users
+
+def get_user_record(username):
+    """Look up a user by username in Firestore, then the in-memory store"""
+    db = get_db()
+    if db is not None:
+        try:
+            with track_data_call("users", "get", docs=1, shape="users/{username}"):
+                doc = db.collection("users").document(username).get()
+            if doc.exists:
+                user = doc.to_dict()
+                user["username"] = username
+                return user
+        except Exception as e:
+            logger.error("Error fetching user: %s", e)
+    return get_default_users().get(username)
+
+def save_user_record(username, password, role="admin"):
+    """Create or replace a user with a bcrypt-hashed password"""
+    db = get_db()
+    user = {"username": username, "password_hash": get_password_hash(password), "role": role}
+    if db is not None:
+        with track_data_call("users", "set", docs=1, shape="users/{username}"):
+            db.collection("users").document(username).set({"password_hash": user["password_hash"], "role": role})
+    else:
+        get_default_users()[username] = user
+    return {"username": username, "role": role}
+
+def authenticate_user(username, password):
+    """Return the user if the password matches; unknown users still pay for a bcrypt check"""
+    global dummy_password_hash
+    user = get_user_record(username)
+    if user is None:
+        if dummy_password_hash is None:
+            dummy_password_hash = get_password_hash(uuid.uuid4().hex)
+        verify_password(password, dummy_password_hash)
+        return None
+    if not verify_password(password, user["password_hash"]):
+        return None
+    return user
+
+async def run_password_task(func, *args):
+    global password_tasks_pending
+    if password_tasks_pending >= PASSWORD_MAX_PENDING:
+        raise HTTPException(status_code=503, detail="Too many login attempts in progress",
+                            headers={"Retry-After": "1"})
+    password_tasks_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, func, *args)
+    finally:
+        password_tasks_pending -= 1
+
+def get_client_ip(request: Request):
+    if TRUST_PROXY_HEADERS:
+        # Entries left of the ones our proxies appended are client-supplied and can be forged
+        forwarded_for = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        if forwarded_for:
+            return forwarded_for[-min(TRUSTED_PROXY_HOPS, len(forwarded_for))]
+    return request.client.host if request.client else "unknown"
+
+def take_login_token(ip):
+    """Consume one token from the IP's bucket; returns seconds to wait if empty"""
+    now = time.monotonic()
+    refill_rate = LOGIN_RATE_PER_MINUTE / 60.0
+    tokens, last = login_buckets.get(ip, (LOGIN_RATE_BURST, now))
+    tokens = min(LOGIN_RATE_BURST, tokens + (now - last) * refill_rate)
+    if tokens < 1:
+        login_buckets[ip] = (tokens, now)
+        return (1 - tokens) / refill_rate
+
+    login_buckets[ip] = (tokens - 1, now)
+    if len(login_buckets) > LOGIN_BUCKETS_MAX:
+        # Forget buckets that would have refilled completely anyway
+        full_after = LOGIN_RATE_BURST / refill_rate
+        for stale_ip in [k for k, (_, t) in login_buckets.items() if now - t > full_after]:
+            del login_buckets[stale_ip]
+    return 0
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -456,43 +2988,111 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def get_cached_token(token_hash: str):
+    """Return the cached (user, exp) for a verified token, evicting it once expired"""
+    with token_cache_lock:
+        entry = token_cache.get(token_hash)
+        if entry is None:
+            record_cache("token", False)
+            return None
+        user, exp = entry
+        if exp <= time.time():
+            del token_cache[token_hash]
+            record_cache("token", False)
+            return None
+        token_cache.move_to_end(token_hash)
+        record_cache("token", True)
+        return entry
+
+def cache_token(token_hash: str, user: dict, exp: float):
+    with token_cache_lock:
+        token_cache[token_hash] = (user, exp)
+        token_cache.move_to_end(token_hash)
+        while len(token_cache) > TOKEN_CACHE_SIZE:
+            token_cache.popitem(last=False)
+
+def revoke_token(token: str, exp: float):
+    """Add a token to the denylist until it would have expired anyway"""
+    token_hash = hash_token(token)
+    now = time.time()
+    with token_cache_lock:
+        token_cache.pop(token_hash, None)
+        revoked_tokens[token_hash] = exp
+        # Drop denylist entries for tokens that have expired on their own
+        for expired_hash in [h for h, e in revoked_tokens.items() if e <= now]:
+            del revoked_tokens[expired_hash]
+
+def is_token_revoked(token_hash: str) -> bool:
+    exp = revoked_tokens.get(token_hash)
+    return exp is not None and exp > time.time()
+
+def decode_token(token: str):
+    """Verify a token and return (user, exp), using the verified-token cache"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    token_hash = hash_token(token)
+    if is_token_revoked(token_hash):
+        raise credentials_exception
+
+    cached = get_cached_token(token_hash)
+    if cached is not None:
+        return cached
+
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-        return {"username": username, "role": payload.get("role", "user")}
+        user = {"username": username, "role": payload.get("role", "user")}
+        exp = float(payload.get("exp", 0))
+        cache_token(token_hash, user, exp)
+        return user, exp
     except JWTError:
         raise credentials_exception
 
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    user, _ = decode_token(credentials.credentials)
+    return dict(user)
+
 # API Endpoints
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
+@app.get("/api/metrics")
+async def get_metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.post("/api/auth/login", response_model=TokenResponse)
-async def login(request: LoginRequest):
-    # Simple authentication (replace with proper user management)
-    admin_username = os.getenv("ADMIN_USERNAME", "admin")
-    admin_password = os.getenv("ADMIN_PASSWORD", "@dminsesg705")
-    
-    if request.username == admin_username and request.password == admin_password:
+async def login(request: LoginRequest, http_request: Request):
+    retry_after = take_login_token(get_client_ip(http_request))
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(int(retry_after) + 1)}
+        )
+
+    user = await run_password_task(authenticate_user, request.username, request.password)
+    if user:
+        role = user.get("role", "user")
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": request.username, "role": "admin"}, 
+            data={"sub": request.username, "role": role}, 
             expires_delta=access_token_expires
         )
         return TokenResponse(
             access_token=access_token,
             token_type="bearer",
-            user_role="admin"
+            user_role=role
         )
     else:
         raise HTTPException(
@@ -500,13 +3100,33 @@ async def login(request: LoginRequest):
             detail="Incorrect username or password"
         )
 
+@app.post("/api/auth/logout")
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    _, exp = decode_token(credentials.credentials)
+    revoke_token(credentials.credentials, exp)
+    return {"message": "Logged out successfully"}
+
+@app.post("/api/users")
+async def create_user(user: UserCreate, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    try:
+        return await run_password_task(save_user_record, user.username, user.password, user.role)
+    except Exception as e:
+        logger.error("Error saving user: %s", e)
+        raise HTTPException(status_code=500, detail="Error saving user")
+
 @app.get("/api/research-areas")
 async def get_research_areas():
-    return get_collection_data("research_areas")
+    areas = get_collection_data("research_areas")
+    index = get_research_area_index()
+    return [{**area, "counts": index.get_counts(area["id"])} for area in areas]
 
 @app.get("/api/research-areas/{area_id}")
 async def get_research_area(area_id: str):
     try:
+        db = get_db()
         if db is None:
             area = next((area for area in in_memory_db["research_areas"] if area["id"] == area_id), None)
             if not area:
@@ -514,7 +3134,8 @@ async def get_research_area(area_id: str):
             return area
         
         doc_ref = db.collection("research_areas").document(area_id)
-        doc = doc_ref.get()
+        with track_data_call("research_areas", "get", docs=1):
+            doc = doc_ref.get()
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Research area not found")
         
@@ -524,9 +3145,25 @@ async def get_research_area(area_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error fetching research area: {e}")
+        logger.error("Error fetching research area: %s", e)
         raise HTTPException(status_code=500, detail="Error fetching research area")
 
+@app.get("/api/research-areas/{area_id}/expanded")
+async def get_research_area_expanded(area_id: str):
+    area = await get_research_area(area_id)
+    index = get_research_area_index()
+    publications = get_documents("publications", index.get_doc_ids("publications", area_id))
+    publications.sort(key=lambda p: p.get("year", 0), reverse=True)
+    news = get_documents("news", index.get_doc_ids("news", area_id))
+    news.sort(key=lambda n: str(n.get("published_date", "")), reverse=True)
+    return {
+        **area,
+        "publications": publications,
+        "projects": get_documents("projects", index.get_doc_ids("projects", area_id)),
+        "people": get_documents("people", index.get_doc_ids("people", area_id)),
+        "news": news,
+    }
+
 @app.get("/api/people")
 async def get_people(category: Optional[str] = None):
     filters = [("category", "==", category)] if category else None
@@ -543,9 +3180,26 @@ async def get_people(category: Optional[str] = None):
             created_at = person.get('created_at', '1970-01-01T00:00:00')
             return (1, created_at)
     
-    people_data.sort(key=sort_key)
+    with timed_phase("sort"):
+        people_data.sort(key=sort_key)
     return people_data
 
+@app.get("/api/people/{person_id}/publications")
+async def get_person_publications(person_id: str):
+    if get_document("people", person_id) is None:
+        raise HTTPException(status_code=404, detail="Person not found")
+    doc_ids = get_author_link_index().get_doc_ids("publications", person_id)
+    publications = get_documents("publications", doc_ids)
+    publications.sort(key=lambda p: p.get("year", 0), reverse=True)
+    return publications
+
+@app.get("/api/people/{person_id}/projects")
+async def get_person_projects(person_id: str):
+    if get_document("people", person_id) is None:
+        raise HTTPException(status_code=404, detail="Person not found")
+    doc_ids = get_author_link_index().get_doc_ids("projects", person_id)
+    return get_documents("projects", doc_ids)
+
 @app.post("/api/people")
 async def create_person(person: PersonCreate, current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "admin":
@@ -576,7 +3230,8 @@ async def get_publications(
     research_area: Optional[str] = None,
     search: Optional[str] = None,
     sort_by: str = "year",
-    sort_order: str = "desc"
+    sort_order: str = "desc",
+    fuzzy: bool = False
 ):
     filters = []
     if publication_type:
@@ -586,21 +3241,36 @@ async def get_publications(
     
     # For Firebase, we'll get all data and filter search/research_area in Python
     # since Firestore has limitations on complex queries
-    if db:
-        order_by = (sort_by, firestore.Query.DESCENDING if sort_order == "desc" else firestore.Query.ASCENDING)
+    if get_db():
+        query = get_firestore_module().Query
+        order_by = (sort_by, query.DESCENDING if sort_order == "desc" else query.ASCENDING)
     else:
         order_by = None
     
     publications = get_collection_data("publications", filters=filters, order_by=order_by)
     
     # Apply additional filters
+    with timed_phase("filter"):
+        publications = filter_publications(publications, research_area, search, fuzzy)
+    return publications
+
+def filter_publications(publications, research_area, search, fuzzy):
+    """Filters Firestore can't express, applied in Python"""
     if research_area:
         publications = [p for p in publications if research_area in p.get("research_areas", [])]
     if search:
         search_lower = search.lower()
+        # fuzzy=true also matches authors spelled differently ("Rahman" -> "Rahmann")
+        fuzzy_authors = set()
+        if fuzzy:
+            fuzzy_authors = {
+                fold_term(match["value"])
+                for match in get_trigram_index().search(search, kinds=["author"], limit=50, threshold=0.5)
+            }
         publications = [p for p in publications if 
                        search_lower in p.get("title", "").lower() or
-                       any(search_lower in author.lower() for author in p.get("authors", []))]
+                       any(search_lower in author.lower() for author in p.get("authors", [])) or
+                       any(fold_term(author) in fuzzy_authors for author in p.get("authors", []))]
     
     return publications
 
@@ -627,6 +3297,93 @@ async def delete_publication(publication_id: str, current_user: dict = Depends(g
     
     return delete_document("publications", publication_id)
 
+@app.post("/api/publications/{publication_id}/pdf")
+async def start_publication_pdf_upload(publication_id: str, upload: PdfUploadCreate, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if get_document("publications", publication_id) is None:
+        raise HTTPException(status_code=404, detail="Publication not found")
+    if upload.size <= 0 or upload.size > MAX_PDF_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    upload_id = uuid.uuid4().hex
+    part_path, session_path = get_pdf_upload_paths(upload_id)
+    os.makedirs(PDF_UPLOAD_DIR, exist_ok=True)
+    open(part_path, "wb").close()
+    session = {"publication_id": publication_id, "filename": sanitize_pdf_filename(upload.filename), "size": upload.size}
+    write_json_atomic(session_path, session)
+    return {"upload_id": upload_id, "offset": 0, "size": upload.size, "chunk_size": PDF_CHUNK_SIZE}
+
+@app.get("/api/uploads/{upload_id}")
+async def get_pdf_upload_status(upload_id: str, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    session, offset = load_pdf_upload(upload_id)
+    return {"upload_id": upload_id, "offset": offset, "size": session["size"]}
+
+@app.patch("/api/uploads/{upload_id}")
+async def upload_pdf_chunk(upload_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    lock = pdf_upload_locks.setdefault(upload_id, asyncio.Lock())
+    async with lock:
+        session, offset = load_pdf_upload(upload_id)
+        try:
+            client_offset = int(request.headers.get("upload-offset", ""))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Upload-Offset header required")
+        if client_offset != offset:
+            # The client resumes from the offset we report
+            raise HTTPException(status_code=409, detail="Offset mismatch", headers={"Upload-Offset": str(offset)})
+
+        part_path, _ = get_pdf_upload_paths(upload_id)
+        with open(part_path, "r+b") as f:
+            f.seek(offset)
+            async for chunk in request.stream():
+                if offset + len(chunk) > session["size"]:
+                    f.truncate(offset)
+                    raise HTTPException(status_code=413, detail="Chunk exceeds declared size")
+                f.write(chunk)
+                offset += len(chunk)
+
+        if offset < session["size"]:
+            return {"upload_id": upload_id, "offset": offset, "size": session["size"], "complete": False}
+
+        try:
+            pdf = await asyncio.get_running_loop().run_in_executor(None, finalize_pdf_upload, upload_id, session)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        finally:
+            pdf_upload_locks.pop(upload_id, None)
+
+    update_document("publications", session["publication_id"], {"pdf": pdf})
+    return {"upload_id": upload_id, "offset": offset, "size": session["size"], "complete": True, "pdf": pdf}
+
+@app.get("/api/publications/{publication_id}/pdf")
+async def download_publication_pdf(publication_id: str):
+    publication = get_document("publications", publication_id)
+    pdf = (publication or {}).get("pdf")
+    if not pdf:
+        raise HTTPException(status_code=404, detail="PDF not found")
+    if MEDIA_BUCKET:
+        return RedirectResponse(pdf["url"])
+
+    headers = {
+        "ETag": f'"{pdf["sha256"]}"',
+        "Cache-Control": "public, max-age=86400",
+        "Content-Disposition": content_disposition("inline", pdf["filename"]),
+    }
+    if PDF_ACCEL_REDIRECT_PREFIX:
+        # Let the fronting nginx serve the file with sendfile
+        headers["X-Accel-Redirect"] = PDF_ACCEL_REDIRECT_PREFIX + pdf["path"]
+        return Response(media_type="application/pdf", headers=headers)
+
+    # FileResponse handles Range/If-Range (206 Partial Content) and uses the ASGI
+    # pathsend extension for zero-copy sends when the server supports it
+    return FileResponse(os.path.join(MEDIA_DIR, pdf["path"]), media_type="application/pdf", headers=headers)
+
 @app.get("/api/projects")
 async def get_projects(category: Optional[str] = None, status: Optional[str] = None):
     filters = []
@@ -703,8 +3460,8 @@ async def get_news(
     if status:
         filters.append(("status", "==", status))
         
-    if db:
-        order_by = ("published_date", firestore.Query.DESCENDING)
+    if get_db():
+        order_by = ("published_date", get_firestore_module().Query.DESCENDING)
     else:
         order_by = None
     
@@ -714,6 +3471,7 @@ async def get_news(
 @app.get("/api/news/{news_id}")
 async def get_news_item(news_id: str):
     try:
+        db = get_db()
         if db is None:
             # Mock behavior - find from in-memory storage
             news_item = next((item for item in in_memory_db["news"] if item["id"] == news_id), None)
@@ -722,7 +3480,8 @@ async def get_news_item(news_id: str):
             return news_item
         
         doc_ref = db.collection("news").document(news_id)
-        doc = doc_ref.get()
+        with track_data_call("news", "get", docs=1):
+            doc = doc_ref.get()
         if not doc.exists:
             raise HTTPException(status_code=404, detail="News item not found")
         
@@ -736,7 +3495,7 @@ async def get_news_item(news_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error fetching news item: {e}")
+        logger.error("Error fetching news item: %s", e)
         raise HTTPException(status_code=500, detail="Error fetching news item")
 
 @app.post("/api/news")
@@ -764,8 +3523,8 @@ async def delete_news(news_id: str, current_user: dict = Depends(get_current_use
 
 @app.get("/api/events")
 async def get_events(upcoming: Optional[bool] = None):
-    if db:
-        order_by = ("date", firestore.Query.ASCENDING)
+    if get_db():
+        order_by = ("date", get_firestore_module().Query.ASCENDING)
     else:
         order_by = None
     events = get_collection_data("events", order_by=order_by)
@@ -817,21 +3576,153 @@ async def delete_photo(photo_id: str, current_user: dict = Depends(get_current_u
     
     return delete_document("photo_gallery", photo_id)
 
+@app.post("/api/uploads/images")
+async def upload_image(
+    file: UploadFile = File(...),
+    collection: Optional[str] = Form(None),
+    doc_id: Optional[str] = Form(None),
+    current_user: dict = Depends(get_current_user)
+):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if collection is not None and collection not in IMAGE_COLLECTIONS:
+        raise HTTPException(status_code=400, detail=f"Images can only be attached to: {', '.join(IMAGE_COLLECTIONS)}")
+    if file.content_type not in ALLOWED_IMAGE_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported image type")
+
+    upload_path = os.path.join(MEDIA_DIR, "originals", f"{uuid.uuid4().hex}.tmp")
+    _, sha256 = await save_upload_stream(file, upload_path, MAX_IMAGE_UPLOAD_BYTES)
+
+    loop = asyncio.get_running_loop()
+    record = get_media_record(sha256)
+    if record is not None and record.get("kind") != "image":
+        # One record per hash - registering an image here would orphan the stored PDF
+        os.remove(upload_path)
+        raise HTTPException(status_code=409, detail=f"File was already uploaded as a {record.get('kind', 'different')} file")
+    if record is not None:
+        # Same bytes were uploaded before - reuse the stored variants
+        os.remove(upload_path)
+        image_variants = record["variants"]
+    else:
+        original_path = os.path.join(MEDIA_DIR, "originals", sha256)
+        os.replace(upload_path, original_path)
+        try:
+            variants = await loop.run_in_executor(
+                get_image_executor(), generate_image_variants,
+                original_path, os.path.join(MEDIA_DIR, "images"), sha256, IMAGE_VARIANT_WIDTHS
+            )
+        except Exception as e:
+            logger.error("Error processing image: %s", e)
+            os.remove(original_path)
+            raise HTTPException(status_code=400, detail="Could not process image")
+        if MEDIA_BUCKET:
+            os.remove(original_path)
+
+        try:
+            image_variants = await loop.run_in_executor(None, publish_image_variants, variants)
+        except Exception as e:
+            logger.error("Error storing image: %s", e)
+            raise HTTPException(status_code=500, detail="Error storing image")
+        register_media(sha256, "image", [f"images/{v['file']}" for v in variants], variants=image_variants)
+
+    largest_jpeg = max((v for v in image_variants if v["format"] == "jpeg"), key=lambda v: v["width"])
+    result = {"image": largest_jpeg["url"], "image_variants": image_variants}
+    if collection and doc_id:
+        update_document(collection, doc_id, {get_image_field(collection): result["image"], "image_variants": image_variants})
+    return result
+
+@app.get("/api/img")
+async def image_proxy(url: str, w: int = 640, fmt: str = "webp"):
+    if not is_allowed_image_url(url):
+        raise HTTPException(status_code=400, detail="Image host not allowed")
+    if fmt not in IMAGE_SAVE_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(IMAGE_SAVE_OPTIONS)}")
+
+    # Snap to a standard width so the cache isn't fragmented by arbitrary sizes
+    width = next((size for size in IMAGE_PROXY_WIDTHS if size >= w), IMAGE_PROXY_WIDTHS[-1])
+    url_hash = hashlib.sha256(url.encode()).hexdigest()
+    loop = asyncio.get_running_loop()
+
+    async def fetch_source(path):
+        return await loop.run_in_executor(None, fetch_remote_image, url, path)
+
+    try:
+        source_path = await get_or_create_cached_image(f"src-{url_hash}", fetch_source)
+    except Exception as e:
+        logger.error("Error fetching proxied image: %s", e)
+        raise HTTPException(status_code=502, detail="Could not fetch image")
+
+    async def render_variant(path):
+        return await loop.run_in_executor(get_image_executor(), render_proxy_image, source_path, path, width, fmt)
+
+    try:
+        image_path = await get_or_create_cached_image(f"{url_hash}-{width}.{IMAGE_SAVE_OPTIONS[fmt][1]}", render_variant)
+    except Exception as e:
+        logger.error("Error resizing proxied image: %s", e)
+        raise HTTPException(status_code=502, detail="Could not process image")
+
+    return FileResponse(image_path, media_type=f"image/{fmt}", headers={"Cache-Control": IMAGE_PROXY_CACHE_CONTROL})
+
+@app.post("/api/images/placeholders/backfill")
+async def backfill_image_placeholders(current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    queued = 0
+    for collection_name in PLACEHOLDER_COLLECTIONS:
+        for doc in get_collection_data(collection_name):
+            image_url = doc.get(get_image_field(collection_name))
+            if image_url and (doc.get("image_meta") or {}).get("source") != image_url:
+                enqueue_image_placeholder(collection_name, doc["id"], image_url)
+                queued += 1
+    return {"queued": queued}
+
+@app.get("/api/media-store")
+async def get_media_store(current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    records = list_media_records()
+    return [
+        {"sha256": sha256, "ref_count": len(record.get("refs", [])), **record}
+        for sha256, record in sorted(records.items(), key=lambda item: item[1].get("created_at", ""))
+    ]
+
+@app.post("/api/media-store/gc")
+async def run_media_gc(grace_hours: Optional[float] = None, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, sweep_media, grace_hours)
+    except Exception as e:
+        logger.error("Error running media GC: %s", e)
+        raise HTTPException(status_code=500, detail="Error running media GC")
+
+@app.get("/api/media/{media_path:path}")
+async def get_media(media_path: str):
+    full_path = resolve_media_path(media_path)
+    if full_path is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(full_path, headers={"Cache-Control": MEDIA_CACHE_CONTROL})
+
 @app.get("/api/settings")
 async def get_settings():
     try:
+        db = get_db()
         if db is None:
             return in_memory_db["settings"]
         
         doc_ref = db.collection("settings").document("site_config")
-        doc = doc_ref.get()
+        with track_data_call("settings", "get", docs=1, shape="settings/site_config"):
+            doc = doc_ref.get()
         if doc.exists:
             return doc.to_dict()
         else:
             # Return default settings if none exist
             return in_memory_db["settings"]
     except Exception as e:
-        print(f"Error fetching settings: {e}")
+        logger.error("Error fetching settings: %s", e)
         return in_memory_db["settings"]
 
 @app.put("/api/settings")
@@ -840,24 +3731,125 @@ async def update_settings(settings_data: dict, current_user: dict = Depends(get_
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     try:
+        db = get_db()
         if db is None:
             in_memory_db["settings"].update(settings_data)
+            notify_collection_changed("settings")
             return in_memory_db["settings"]
         
         settings_data['updated_at'] = datetime.utcnow()
         doc_ref = db.collection("settings").document("site_config")
-        doc_ref.set(settings_data, merge=True)
+        with track_data_call("settings", "set", docs=1, shape="settings/site_config"):
+            doc_ref.set(settings_data, merge=True)
         
         # Return updated settings
-        updated_doc = doc_ref.get().to_dict()
+        with track_data_call("settings", "get", docs=1, shape="settings/site_config"):
+            updated_doc = doc_ref.get().to_dict()
         for key, value in updated_doc.items():
             if hasattr(value, 'isoformat'):
                 updated_doc[key] = value.isoformat()
+        notify_collection_changed("settings")
         return updated_doc
     except Exception as e:
-        print(f"Error updating settings: {e}")
+        logger.error("Error updating settings: %s", e)
         raise HTTPException(status_code=500, detail="Error updating settings")
 
+@app.get("/api/search")
+async def search(q: str, types: Optional[str] = None, limit: int = 20):
+    started = time.perf_counter()
+    query_terms = tokenize(q)
+    collections = None
+    if types:
+        collections = {t.strip() for t in types.split(",")} & set(SEARCH_FIELDS)
+    
+    results = []
+    if query_terms:
+        for score, key in get_search_index().search(query_terms, collections, max(1, min(limit, 100))):
+            collection_name, doc_id = key
+            doc = search_docs[key]
+            highlights = {}
+            for field, text in doc["fields"].items():
+                snippet = highlight_text(text, query_terms)
+                if snippet:
+                    highlights[field] = snippet
+            results.append({
+                "type": collection_name,
+                "id": doc_id,
+                "title": doc["title"],
+                "score": round(score, 4),
+                "highlights": highlights
+            })
+    
+    return {
+        "query": q,
+        "results": results,
+        "took_ms": round((time.perf_counter() - started) * 1000, 3)
+    }
+
+def parse_kinds(kinds, allowed):
+    """Comma-separated kinds filter; None means all kinds, no valid kind at all is a 400"""
+    if not kinds:
+        return None
+    kind_list = sorted({k.strip() for k in kinds.split(",") if k.strip() in allowed})
+    if not kind_list:
+        raise HTTPException(status_code=400, detail=f"kinds must include one of: {', '.join(allowed)}")
+    return kind_list
+
+@app.get("/api/search/fuzzy")
+async def fuzzy_search(q: str, kinds: Optional[str] = None, limit: int = 10, threshold: float = FUZZY_THRESHOLD):
+    kind_list = parse_kinds(kinds, FUZZY_KINDS)
+    matches = get_trigram_index().search(q, kind_list, max(1, min(limit, 100)), threshold)
+    return {"query": q, "matches": matches}
+
+@app.get("/api/autocomplete")
+async def autocomplete(q: str, kinds: Optional[str] = None, limit: int = 10):
+    kind_list = parse_kinds(kinds, AUTOCOMPLETE_KINDS)
+    suggestions = get_autocomplete_index().suggest(q, kind_list, max(1, min(limit, 50)))
+    return JSONResponse(
+        content={"query": q, "suggestions": suggestions},
+        headers={"Cache-Control": "public, max-age=30"}
+    )
+
+@app.get("/api/admin/firestore-costs")
+async def get_firestore_costs(days: int = 1, top: int = 20, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return get_cost_report(max(1, min(days, COST_RETENTION_DAYS)), max(1, min(top, 100)))
+
+@app.get("/api/admin/loop-blocks")
+async def get_loop_blocks(current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return {
+        "mode": BLOCKING_DETECTOR,
+        "threshold_ms": BLOCKING_THRESHOLD_MS,
+        "blocks_by_route": loop_blocks,
+        "recent": list(blocking_reports),
+    }
+
+@app.get("/api/admin/profiles")
+async def list_profiles(current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return [{k: v for k, v in profile.items() if k != "collapsed"} for profile in reversed(profiles.values())]
+
+@app.get("/api/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    profile = profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        content=profile["collapsed"],
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'}
+    )
+
 @app.get("/api/dashboard/stats")
 async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "admin":
@@ -884,7 +3876,7 @@ async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
         
         return stats
     except Exception as e:
-        print(f"Error fetching dashboard stats: {e}")
+        logger.error("Error fetching dashboard stats: %s", e)
         raise HTTPException(status_code=500, detail="Error fetching dashboard stats")
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Checks author linkage between publications/projects and people.
+
+Two people share a surname and first initial; full names must only link to
+their own person, and the initials fallback must only apply to abbreviated
+names. Uses the in-memory store. Runs under pytest or directly:
+
+    python test_author_links.py
+"""
+
+import sys
+
+from fastapi.testclient import TestClient
+
+import server_with_changes as server
+
+MOHAMMAD = {"id": "p-mohammad", "name": "Dr. Mohammad Rahman"}
+MIZANUR = {"id": "p-mizanur", "name": "Dr. Mizanur Rahman"}
+
+
+def test_initials_only_for_abbreviated_names():
+    index = server.AuthorLinkIndex([MOHAMMAD], {})
+    assert index.resolve("Mohammad Rahman") == "p-mohammad"
+    assert index.resolve("M. Rahman") == "p-mohammad"
+    assert index.resolve("M Rahman") == "p-mohammad"
+    # Same surname and first initial, but a different full name
+    assert index.resolve("Dr. Mizanur Rahman") is None
+
+    # With both people present the abbreviation is ambiguous, full names stay distinct
+    index = server.AuthorLinkIndex([MOHAMMAD, MIZANUR], {})
+    assert index.resolve("Mizanur Rahman") == "p-mizanur"
+    assert index.resolve("Mohammad Rahman") == "p-mohammad"
+    assert index.resolve("M. Rahman") is None
+
+
+def test_person_projects_endpoint():
+    saved = {name: server.in_memory_db[name] for name in ("people", "projects")}
+    saved_db, saved_attempted = server.db, server.firebase_init_attempted
+    server.db, server.firebase_init_attempted = None, True
+    server.in_memory_db["people"] = [dict(MOHAMMAD)]
+    server.in_memory_db["projects"] = [
+        {"id": "1", "name": "A", "team_leader": "Dr. Mohammad Rahman", "team_members": ""},
+        {"id": "2", "name": "B", "team_leader": "Someone Else", "team_members": "M. Rahman"},
+        {"id": "3", "name": "C", "team_leader": "Dr. Mizanur Rahman", "team_members": ""},
+    ]
+    server.author_link_index = None
+    try:
+        response = TestClient(server.app).get("/api/people/p-mohammad/projects")
+        assert response.status_code == 200, response.text
+        assert sorted(project["id"] for project in response.json()) == ["1", "2"], response.json()
+    finally:
+        server.in_memory_db.update(saved)
+        server.db, server.firebase_init_attempted = saved_db, saved_attempted
+        server.author_link_index = None
+
+
+if __name__ == "__main__":
+    try:
+        test_initials_only_for_abbreviated_names()
+        test_person_projects_endpoint()
+    except AssertionError as e:
+        print(f"❌ Author link check failed: {e}")
+        sys.exit(1)
+    print("✅ Author link check passed")
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Exercises the real Firestore code paths against a local emulator.
+
+The emulator is seeded from generate_dataset.py, then every query shape the
+API issues (where / order_by / limit) is checked against the same filter done
+in Python, and the add / update / delete / exists / batched-get paths are run
+end to end, including their 404s. Document reads are taken from the request
+metrics, so a query that stopped being pushed down to Firestore shows up as
+reading more documents than it returns.
+
+    gcloud emulators firestore start --host-port=localhost:8080
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python test_firestore_emulator.py
+
+Skipped (not failed) when no emulator is reachable. Runs under pytest or directly.
+"""
+
+import sys
+import unittest
+from datetime import datetime
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import server_with_changes as server
+from generate_dataset import emulator_reachable, generate_dataset, seed_firestore, to_firestore_value, with_storage_fields
+
+SCALE = "500"
+SEED = 7
+
+# (collection, filters, order_by as (field, "asc" | "desc"), limit) - the shapes the endpoints send
+QUERY_CASES = [
+    ("people", [("category", "==", "advisor")], None, None),
+    ("publications", [], ("year", "desc"), None),
+    ("publications", [("year", "==", 2022)], ("year", "desc"), None),
+    ("publications", [("publication_type", "==", "journal")], ("year", "asc"), None),
+    ("projects", [("status", "==", "ongoing")], None, None),
+    ("projects", [("category", "==", "missing")], None, None),
+    ("achievements", [("category", "==", "award")], None, None),
+    ("news", [("status", "==", "published")], ("published_date", "desc"), 10),
+    ("news", [("is_featured", "==", True), ("category", "==", "news")], ("published_date", "desc"), None),
+    ("events", [], ("date", "asc"), None),
+]
+
+dataset = None
+
+
+def setup_emulator():
+    """Point the server at the emulator and seed it once per run"""
+    global dataset
+    if not emulator_reachable():
+        raise unittest.SkipTest("No Firestore emulator reachable at FIRESTORE_EMULATOR_HOST")
+    if dataset is None:
+        server.db = None
+        server.firebase_init_attempted = False
+        assert server.get_db() is not None, "Firestore client could not be created"
+        dataset = with_storage_fields(generate_dataset(SCALE, SEED), SEED)
+        seed_firestore(server.get_db(), dataset)
+    return server.get_db()
+
+
+def normalize(value):
+    """Stored timestamps come back timezone-aware; compare them as naive datetimes"""
+    value = to_firestore_value(value)
+    return value.replace(tzinfo=None) if isinstance(value, datetime) else value
+
+
+def expected_results(collection_name, filters, order_by, limit):
+    docs = [doc for doc in dataset[collection_name]
+            if all(field in doc and doc[field] == value for field, _, value in filters)]
+    if order_by:
+        field, direction = order_by
+        # Firestore leaves out documents without the ordering field
+        docs = sorted((doc for doc in docs if doc.get(field) is not None),
+                      key=lambda doc: normalize(doc[field]), reverse=direction == "desc")
+    return docs[:limit] if limit else docs
+
+
+def run_query(collection_name, filters, order_by, limit):
+    """get_collection_data with request metrics attached; returns (docs, documents read, errors)"""
+    query = server.get_firestore_module().Query
+    firestore_order = None
+    if order_by:
+        firestore_order = (order_by[0], query.DESCENDING if order_by[1] == "desc" else query.ASCENDING)
+    key = (collection_name, "query")
+    errors_before = server.data_call_errors.get(key, 0)
+    metrics = server.RequestMetrics()
+    token = server.request_metrics.set(metrics)
+    try:
+        docs = server.get_collection_data(collection_name, filters=filters or None, order_by=firestore_order, limit=limit)
+    finally:
+        server.request_metrics.reset(token)
+    return docs, metrics.docs["read"], server.data_call_errors.get(key, 0) - errors_before
+
+
+def test_query_pushdown():
+    setup_emulator()
+    for collection_name, filters, order_by, limit in QUERY_CASES:
+        case = f"{collection_name} {filters} {order_by} limit={limit}"
+        docs, reads, errors = run_query(collection_name, filters, order_by, limit)
+        expected = expected_results(collection_name, filters, order_by, limit)
+
+        # get_collection_data falls back to mock data on errors, which would pass unnoticed otherwise
+        assert errors == 0, f"{case}: query failed"
+        assert len(docs) == len(expected), f"{case}: {len(docs)} documents, expected {len(expected)}"
+        assert reads == len(docs), f"{case}: read {reads} documents to return {len(docs)}"
+        if order_by:
+            field = order_by[0]
+            assert [normalize(d[field]) for d in docs] == [normalize(d[field]) for d in expected], f"{case}: order"
+        if limit:
+            # Ties at the cut-off may be broken differently; every result must still qualify
+            assert {d["id"] for d in docs} <= {d["id"] for d in expected_results(collection_name, filters, order_by, None)}, case
+        else:
+            assert {d["id"] for d in docs} == {d["id"] for d in expected}, f"{case}: different documents"
+
+
+def test_document_lifecycle():
+    setup_emulator()
+    created = server.add_document("news", {
+        "title": "Emulator item", "content": "<p>Emulator</p>", "excerpt": "Emulator", "author": "test",
+        "published_date": "2024-05-01T10:00:00", "category": "news", "is_featured": False,
+        "tags": ["emulator"], "status": "draft",
+    })
+    doc_id = created["id"]
+    try:
+        stored = server.get_document("news", doc_id)
+        assert stored is not None and stored["title"] == "Emulator item"
+        assert normalize(stored["published_date"]) == datetime(2024, 5, 1, 10, 0), stored["published_date"]
+
+        updated = server.update_document("news", doc_id, {"title": "Emulator item (edited)"})
+        assert updated["title"] == "Emulator item (edited)" and updated["excerpt"] == "Emulator"
+        assert server.get_document("news", doc_id)["title"] == "Emulator item (edited)"
+
+        some_ids = [doc["id"] for doc in dataset["publications"][:5]]
+        batch = server.get_documents("publications", some_ids + ["does-not-exist"])
+        assert sorted(doc["id"] for doc in batch) == sorted(some_ids)
+    finally:
+        server.delete_document("news", doc_id)
+
+    assert server.get_document("news", doc_id) is None
+    for call in (lambda: server.update_document("news", doc_id, {"title": "x"}),
+                 lambda: server.delete_document("news", doc_id)):
+        try:
+            call()
+            raise AssertionError("expected a 404 for a missing document")
+        except HTTPException as e:
+            assert e.status_code == 404, e.status_code
+
+
+def test_endpoints():
+    setup_emulator()
+    client = TestClient(server.app)
+    response = client.get("/api/publications", params={"year": 2022})
+    assert response.status_code == 200
+    years = [p["year"] for p in response.json()]
+    assert years == [2022] * len(expected_results("publications", [("year", "==", 2022)], None, None))
+
+    response = client.get("/api/news", params={"status": "published", "limit": 5})
+    assert response.status_code == 200 and len(response.json()) == 5
+    dates = [normalize(n["published_date"]) for n in response.json()]
+    assert dates == sorted(dates, reverse=True)
+    assert "db;dur=" in response.headers["Server-Timing"]
+
+
+def test_simulated_conditions():
+    setup_emulator()
+    saved = server.SIMULATED_LATENCY_MS, server.SIMULATED_JITTER_MS, server.SIMULATED_ERROR_RATE
+    try:
+        server.SIMULATED_LATENCY_MS, server.SIMULATED_JITTER_MS, server.SIMULATED_ERROR_RATE = 30, 0, 0
+        metrics = server.RequestMetrics()
+        token = server.request_metrics.set(metrics)
+        try:
+            server.get_document("people", dataset["people"][0]["id"])
+        finally:
+            server.request_metrics.reset(token)
+        assert metrics.phases["db"] >= 30, metrics.phases
+
+        server.SIMULATED_LATENCY_MS, server.SIMULATED_ERROR_RATE = 0, 1.0
+        try:
+            server.get_document("people", dataset["people"][0]["id"])
+            raise AssertionError("expected a simulated failure")
+        except server.SimulatedDatastoreError:
+            pass
+    finally:
+        server.SIMULATED_LATENCY_MS, server.SIMULATED_JITTER_MS, server.SIMULATED_ERROR_RATE = saved
+
+
+if __name__ == "__main__":
+    try:
+        for test in (test_query_pushdown, test_document_lifecycle, test_endpoints, test_simulated_conditions):
+            test()
+    except unittest.SkipTest as e:
+        print(f"⏭️  Firestore emulator checks skipped: {e}")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"❌ Firestore emulator check failed: {e}")
+        sys.exit(1)
+    print("✅ Firestore emulator checks passed")
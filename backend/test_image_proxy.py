@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Checks /api/img against a local stand-in image server.
+
+A throwaway http.server serves a generated JPEG on 127.0.0.1; the proxy is
+pointed at it with a temporary cache directory. Runs under pytest or directly:
+
+    python test_image_proxy.py
+"""
+
+import io
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import server_with_changes as server
+
+
+def make_jpeg(width=1500, height=1000):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (30, 120, 200)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class StandInImageServer(ThreadingHTTPServer):
+    def __init__(self):
+        self.image = make_jpeg()
+        self.hits = 0
+
+        server_ref = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server_ref.hits += 1
+                redirects = {
+                    "/moved.jpg": "/photo.jpg",
+                    "/escape.jpg": f"http://localhost:{self.server.server_port}/photo.jpg",
+                }
+                if self.path in redirects:
+                    self.send_response(302)
+                    self.send_header("Location", redirects[self.path])
+                    self.end_headers()
+                    return
+                if self.path != "/photo.jpg":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(server_ref.image)))
+                self.end_headers()
+                self.wfile.write(server_ref.image)
+
+            def log_message(self, *args):
+                pass
+
+        super().__init__(("127.0.0.1", 0), Handler)
+
+
+def test_image_proxy():
+    upstream = StandInImageServer()
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    image_url = f"http://127.0.0.1:{upstream.server_port}/photo.jpg"
+
+    saved = (server.IMAGE_PROXY_ALLOWED_HOSTS, server.IMAGE_PROXY_CACHE_DIR, server.IMAGE_PROXY_CACHE_BYTES)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        server.IMAGE_PROXY_ALLOWED_HOSTS = {"127.0.0.1"}
+        server.IMAGE_PROXY_CACHE_DIR = cache_dir
+        server.image_proxy_cache = None
+
+        try:
+            with TestClient(server.app) as client:
+                response = client.get("/api/img", params={"url": image_url, "w": 300})
+                assert response.status_code == 200, response.text
+                assert response.headers["content-type"] == "image/webp"
+                assert "max-age" in response.headers["cache-control"]
+                assert Image.open(io.BytesIO(response.content)).size == (320, 213)
+
+                # Cached variant and cached source: no further upstream fetches
+                client.get("/api/img", params={"url": image_url, "w": 300})
+                response = client.get("/api/img", params={"url": image_url, "w": 700, "fmt": "jpeg"})
+                assert response.status_code == 200
+                assert Image.open(io.BytesIO(response.content)).size == (800, 533)
+                assert upstream.hits == 1, upstream.hits
+
+                assert client.get("/api/img", params={"url": "https://evil.example/x.jpg"}).status_code == 400
+                assert client.get("/api/img", params={"url": image_url.replace("photo", "missing")}).status_code == 502
+
+                # Redirects are followed only to allowed hosts
+                assert client.get("/api/img", params={"url": image_url.replace("photo", "moved")}).status_code == 200
+                assert client.get("/api/img", params={"url": image_url.replace("photo", "escape")}).status_code == 502
+
+                # Size bound: shrinking the budget evicts least recently used entries
+                server.IMAGE_PROXY_CACHE_BYTES = 20000
+                client.get("/api/img", params={"url": image_url, "w": 160})
+                assert server.image_proxy_cache_bytes <= 20000 or len(server.image_proxy_cache) == 1
+        finally:
+            upstream.shutdown()
+            server.IMAGE_PROXY_ALLOWED_HOSTS, server.IMAGE_PROXY_CACHE_DIR, server.IMAGE_PROXY_CACHE_BYTES = saved
+            server.image_proxy_cache = None
+
+
+if __name__ == "__main__":
+    try:
+        test_image_proxy()
+    except AssertionError as e:
+        print(f"❌ Image proxy check failed: {e}")
+        sys.exit(1)
+    print("✅ Image proxy check passed")
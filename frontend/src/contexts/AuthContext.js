@@ -121,6 +121,15 @@ export function AuthProvider({ children }) {
   };
 
   const logout = () => {
+    // Revoke the token server-side; local session is cleared regardless
+    const backendUrl = process.env.REACT_APP_BACKEND_URL || 'https://site-mod.preview.emergentagent.com';
+    const sessionToken = localStorage.getItem('admin_session');
+    if (sessionToken) {
+      axios.post(`${backendUrl}/api/auth/logout`, {}, {
+        headers: { Authorization: `Bearer ${sessionToken}` }
+      }).catch(() => {});
+    }
+
     localStorage.removeItem('admin_user');
     localStorage.removeItem('admin_session');
     dispatch({ type: 'LOGOUT' });